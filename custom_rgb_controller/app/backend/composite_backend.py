@@ -0,0 +1,187 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from app.core.led_map import LedMap
+from app.core.layout import LayoutManager
+from app.backend.openrgb_backend import OpenRGBBackend
+
+def parse_servers(servers):
+    """
+    Normalizes the 'openrgb_servers' setting: a list of "host:port" strings,
+    {'host': ..., 'port': ...} dicts or (host, port) pairs, so its own
+    output parses unchanged. Returns [(host, port), ...].
+    """
+    result = []
+    for entry in servers or []:
+        if isinstance(entry, dict):
+            host, port = entry.get('host', '127.0.0.1'), entry.get('port', 6742)
+        elif isinstance(entry, (tuple, list)):
+            host, port = entry
+        else:
+            host, _, port = str(entry).strip().rpartition(':')
+            if not host:
+                host, port = port, 6742
+        if host in ("0.0.0.0", "::"):
+            host = "127.0.0.1"
+        if host and (host, int(port)) not in result:
+            result.append((host, int(port)))
+    return result
+
+class ServerStats:
+    def __init__(self):
+        self.frames = 0
+        self.errors = 0
+        self.latency_ms = 0.0 # Moving average of push_frame time
+        self.bytes_per_s = 0.0
+        self.last_push = 0.0
+
+    def record(self, elapsed, nbytes):
+        now = time.perf_counter()
+        if self.last_push:
+            interval = max(1e-6, now - self.last_push)
+            self.bytes_per_s += 0.1 * (nbytes / interval - self.bytes_per_s)
+        self.last_push = now
+        self.latency_ms += 0.1 * (elapsed * 1000.0 - self.latency_ms)
+        self.frames += 1
+
+class CompositeBackend:
+    """
+    Drives several OpenRGB SDK servers as one installation. Their devices
+    are merged into one global LED map (in server order, names prefixed with
+    the host), and each frame is split into per-server slices that are pushed
+    concurrently. Every server reconnects on its own; the merged map is
+    rebuilt whenever one of them changes.
+    """
+    def __init__(self, servers, rate_limits=None, fast_path=True, keepalive=1.0):
+        self.rate_limits = rate_limits if rate_limits is not None else {}
+        self.backends = []
+        servers = parse_servers(servers)
+        for host, port in servers:
+            prefix = f"{host}: " if len(servers) > 1 else ""
+            options = {'fast_path': fast_path, 'rate_limits': self.rate_limits, 'device_prefix': prefix,
+                       'keepalive': keepalive}
+            try:
+                backend = OpenRGBBackend(host, port, **options)
+                backend.get_led_map()
+            except Exception as e:
+                print(f"OpenRGB server {host}:{port} unavailable, retrying in background: {e}")
+                backend = OpenRGBBackend(host, port, connect=False, **options)
+            self.backends.append(backend)
+
+        self.stats = [ServerStats() for _ in self.backends]
+        self.regions = []
+        self.map_version = 0
+        self._led_map = None
+        self._child_versions = None
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(self.backends)), thread_name_prefix="openrgb-push")
+
+    @property
+    def led_map(self):
+        # Cheap check every frame; rebuild only after a server's map changed
+        versions = tuple(b.map_version for b in self.backends)
+        if versions != self._child_versions:
+            with self._lock:
+                if versions != self._child_versions:
+                    self._rebuild(versions)
+        return self._led_map
+
+    def get_led_map(self):
+        return self.led_map
+
+    def _rebuild(self, versions):
+        maps = [b.led_map if b.led_map is not None else LedMap() for b in self.backends]
+        prefixes = [b.device_prefix for b in self.backends]
+
+        self.regions = []
+        offset = 0
+        for led_map in maps:
+            self.regions.append(slice(offset, offset + len(led_map)))
+            offset += len(led_map)
+
+        self._led_map = LayoutManager().apply(LedMap.merge(maps, prefixes))
+        self._child_versions = versions
+        self.map_version += 1
+
+    def push_frame(self, frame):
+        self.led_map # Rebuilds the regions if a server's map changed
+        regions = self.regions
+        futures = []
+        for i, backend in enumerate(self.backends):
+            if i >= len(regions) or regions[i].stop == regions[i].start:
+                continue
+            futures.append(self._pool.submit(self._push, i, backend, frame[regions[i]]))
+        wait(futures)
+
+    def _push(self, i, backend, frame):
+        start = time.perf_counter()
+        try:
+            backend.push_frame(frame)
+        except Exception:
+            self.stats[i].errors += 1
+            return
+        self.stats[i].record(time.perf_counter() - start, frame.nbytes)
+
+    def server_stats(self):
+        """
+        Per-server connection state, push latency and throughput.
+        """
+        result = []
+        for backend, stats in zip(self.backends, self.stats):
+            result.append({
+                'host': backend.host,
+                'port': backend.port,
+                'connected': backend.connected,
+                'leds': len(backend.led_map) if backend.led_map is not None else 0,
+                'frames': stats.frames,
+                'errors': stats.errors,
+                'latency_ms': stats.latency_ms,
+                'bytes_per_s': stats.bytes_per_s,
+            })
+        return result
+
+    def frame_layout(self):
+        self.led_map # Rebuilds the regions if a server's map changed
+        layout = []
+        for backend, region in zip(self.backends, self.regions):
+            layout += backend.frame_layout(region.start)
+        return layout
+
+    def frame_stats(self):
+        totals = [b.frame_stats() for b in self.backends]
+        sent = sum(t['sent'] for t in totals)
+        duplicates = sum(t['duplicates'] for t in totals)
+        total = sent + duplicates
+        return {'sent': sent, 'duplicates': duplicates, 'duplicate_ratio': duplicates / total if total else 0.0}
+
+    def device_stats(self):
+        # Device indices are global, counting devices of earlier servers
+        result = []
+        base = 0
+        for backend in self.backends:
+            for s in backend.device_stats():
+                result.append({**s, 'index': s['index'] + base})
+            base += len(backend.led_map.devices) if backend.led_map is not None else 0
+        return result
+
+    def refresh_devices(self):
+        for backend in self.backends:
+            backend.refresh_devices()
+
+    def reconnect(self, host=None, port=None):
+        # The Settings page edits the primary server
+        for i, backend in enumerate(self.backends):
+            if i == 0:
+                backend.reconnect(host, port)
+            else:
+                backend.reconnect()
+
+    @property
+    def connected(self):
+        return any(b.connected for b in self.backends)
+
+    def close(self):
+        for backend in self.backends:
+            backend.close()
+        self._pool.shutdown(wait=False)
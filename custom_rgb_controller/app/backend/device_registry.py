@@ -0,0 +1,52 @@
+from openrgb.utils import ModeColors
+
+class DeviceInfo:
+    """
+    Plain snapshot of one controller's metadata. Reading it never touches
+    the network.
+    """
+    def __init__(self, index, device):
+        self.index = index
+        self.name = device.name
+        self.type = getattr(device.type, 'name', str(device.type))
+        self.zones = [(zone.name, len(zone.leds), getattr(zone, 'matrix_map', None)) for zone in device.zones]
+        self.led_count = len(device.leds)
+        self.modes = [mode.name for mode in device.modes]
+        self.active_mode = device.active_mode
+
+        mode = device.modes[device.active_mode] if device.modes else None
+        self.per_led = mode is not None and mode.color_mode == ModeColors.PER_LED
+
+        # Kept for devices that must go through openrgb-python's set_colors
+        self.device = device
+
+class DeviceRegistry:
+    """
+    Cached controller metadata for one OpenRGB server. It is rebuilt from a
+    client that has just downloaded the device list (on connect, after a
+    device-list-updated notification or on request); everything else reads
+    the cache.
+    """
+    def __init__(self):
+        self.devices = []
+        self.version = 0
+
+    def update_from(self, client):
+        self.devices = [DeviceInfo(i, device) for i, device in enumerate(client.devices)]
+        self.version += 1
+
+    def led_specs(self):
+        # LedMap specs; zones that don't cover the device become one zone
+        specs = []
+        for info in self.devices:
+            zones = info.zones
+            if sum(zone[1] for zone in zones) != info.led_count:
+                zones = [(info.name, info.led_count)]
+            specs.append((info.name, zones))
+        return specs
+
+    def __iter__(self):
+        return iter(self.devices)
+
+    def __len__(self):
+        return len(self.devices)
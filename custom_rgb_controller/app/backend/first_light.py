@@ -0,0 +1,120 @@
+import json
+import os
+import struct
+import threading
+import numpy as np
+
+from app.path_utils import get_app_root
+from app.backend.sdk_writer import (HEADER, MAGIC, PKT_REQUEST_PROTOCOL_VERSION, ACK_PROTOCOL_VERSION,
+                                    FrameWriter, open_sdk_socket, recv_exact)
+
+PKT_REQUEST_CONTROLLER_COUNT = 0
+
+def frame_path():
+    return os.path.join(get_app_root(), 'last_frame.npz')
+
+def save_last_frame(path, frame, layout):
+    """
+    Stores the last output frame with the layout needed to replay it (see
+    frame_layout on the backends). Written to a temp file and renamed so a
+    crash mid-write never leaves a broken file behind.
+    """
+    tmp = path + ".tmp"
+    with open(tmp, 'wb') as f:
+        np.savez(f, frame=np.asarray(frame, dtype=np.uint8), layout=np.array(json.dumps(layout)))
+    os.replace(tmp, path)
+
+class LastFrameSaver:
+    """
+    Saves the renderer's last frame when it changed since the last save.
+    The renderer replaces its last frame on change, so identity is enough.
+    """
+    def __init__(self, path=None):
+        self.path = path or frame_path()
+        self.saved = None
+
+    def save(self, frame, backend):
+        if frame is None or frame is self.saved:
+            return
+        frame_layout = getattr(backend, 'frame_layout', None)
+        layout = frame_layout() if frame_layout else []
+        if not layout:
+            return
+        try:
+            save_last_frame(self.path, frame, layout)
+            self.saved = frame
+        except Exception as e:
+            print(f"Failed to save last frame: {e}")
+
+def load_last_frame(path):
+    # Returns (frame, layout) or None
+    try:
+        with np.load(path) as data:
+            return data['frame'], json.loads(str(data['layout']))
+    except (OSError, ValueError, KeyError):
+        return None
+
+def _request(sock, packet_id, payload=b''):
+    # Sends a request and returns the reply payload, skipping notifications
+    sock.sendall(HEADER.pack(MAGIC, 0, packet_id, len(payload)) + payload)
+    while True:
+        _, _, reply_id, size = HEADER.unpack(recv_exact(sock, HEADER.size))
+        data = recv_exact(sock, size) if size else b''
+        if reply_id == packet_id:
+            return data
+
+def push_last_frame(path, timeout=0.5):
+    """
+    Replays the saved frame with raw UpdateLEDs packets, without
+    downloading controller data. A server is skipped if its device count
+    changed since the frame was saved. Returns the number of devices lit.
+    """
+    saved = load_last_frame(path)
+    if saved is None:
+        return 0
+    frame, layout = saved
+
+    lit = 0
+    for server in layout:
+        try:
+            sock = open_sdk_socket(server['host'], server['port'], timeout=timeout)
+        except OSError:
+            continue
+        try:
+            count, = struct.unpack('<I', _request(sock, PKT_REQUEST_CONTROLLER_COUNT)[:4])
+            if count != server['device_count']:
+                continue
+            devices = [(index, slice(start, stop)) for index, start, stop in server['devices'] if stop <= len(frame)]
+            writer = FrameWriter(sock, devices)
+            writer.write(frame)
+            # The server handles packets in order; this reply means the colors were applied
+            _request(sock, PKT_REQUEST_PROTOCOL_VERSION, struct.pack('<I', ACK_PROTOCOL_VERSION))
+            lit += len(writer.devices)
+            writer.close()
+        except (OSError, struct.error) as e:
+            print(f"Could not restore last frame on {server['host']}:{server['port']}: {e}")
+        finally:
+            sock.close()
+    return lit
+
+def start_first_light(settings_path, frame_path, on_lit=None):
+    """
+    Pushes the saved frame on a background thread while the GUI is still
+    being built. on_lit(devices) runs once the colors are on the devices.
+    """
+    try:
+        with open(settings_path, 'r') as f:
+            settings = json.load(f)
+    except (OSError, ValueError):
+        settings = {}
+    if not settings.get('restore_last_frame', True) or not os.path.exists(frame_path):
+        return None
+
+    def run():
+        lit = push_last_frame(frame_path)
+        if lit and on_lit:
+            on_lit(lit)
+
+    thread = threading.Thread(target=run, name="first-light", daemon=True)
+    thread.start()
+    return thread
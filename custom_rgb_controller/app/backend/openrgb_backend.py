@@ -1,18 +1,21 @@
 import os
 import shutil
 import subprocess
+import threading
 import time
 
+import numpy as np
 from openrgb import OpenRGBClient
 from openrgb.utils import RGBColor
 
+from app.core.led_map import LedMap
+from app.core.layout import LayoutManager
+from app.engine.waker import wake
+from app.backend.device_registry import DeviceRegistry
+from app.backend.sdk_writer import DeviceSender, DuplicateFilter, FrameWriter, open_sdk_socket, probe_server
+
 def _is_openrgb_server_ready(host: str, port: int) -> bool:
-    try:
-        client = OpenRGBClient(address=host, port=int(port))
-        client.disconnect()
-        return True
-    except Exception:
-        return False
+    return probe_server(host, int(port))
 
 def _find_openrgb_executable(explicit_path: str | None = None) -> str | None:
     if explicit_path:
@@ -64,8 +67,48 @@ def start_openrgb_server(host: str, port: int, exe_path: str | None = None) -> s
     )
 
 class OpenRGBBackend:
-    def __init__(self, host: str = "127.0.0.1", port: int = 6742):
-        self.client = OpenRGBClient(address=host, port=int(port))
+    """
+    Pushes frames to an OpenRGB SDK server. If the connection drops (server
+    restart, device replug), push_frame stops sending and a background thread
+    reconnects with exponential backoff, then rebuilds the LED map. Callers
+    watch map_version (or led_map identity) to pick up the new map.
+
+    With per_device, every per-LED device gets its own connection and sender
+    thread, rate limited by rate_limits ({device name: max fps}, read live).
+
+    Device metadata lives in a DeviceRegistry. It is only re-downloaded when
+    the server reports a device list change or refresh_devices() is called.
+    """
+    RECONNECT_MIN_S = 0.5
+    RECONNECT_MAX_S = 10.0
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6742, fast_path: bool = True,
+                 per_device: bool = True, rate_limits: dict | None = None, connect: bool = True,
+                 device_prefix: str = "", keepalive=1.0):
+        self.host = host
+        self.port = int(port)
+        # With connect=False the first connection is made in the background
+        self.client = OpenRGBClient(address=host, port=int(port)) if connect else None
+        self.registry = DeviceRegistry()
+        self.led_map = None
+        self.map_version = 0
+        self.fast_path = fast_path
+        self.per_device = per_device
+        self.rate_limits = rate_limits if rate_limits is not None else {}
+        self.device_prefix = device_prefix # Prepended to device names for rate limits and stats
+        self.keepalive = keepalive # Seconds between resends of an unchanged frame, 0 = no dedup
+        self.frame_filter = None
+        self.writer = None
+        self.senders = []
+        self.slow_devices = []
+
+        self.connected = True
+        self._lock = threading.Lock()
+        self._reconnect_thread = None
+        self._refresh_thread = None
+        self._closed = False
+        if not connect:
+            self._start_reconnect()
 
     @staticmethod
     def is_installed() -> bool:
@@ -85,12 +128,12 @@ class OpenRGBBackend:
             return None
 
         proc = start_openrgb_server(host, int(port), exe_path=exe_path)
+        if not proc:
+            return None
         if wait_s is None:
             while not _is_openrgb_server_ready(probe_host, int(port)):
                 time.sleep(0.2)
             return proc
-        if not proc:
-            return None
 
         deadline = time.time() + max(0.0, float(wait_s))
         while time.time() < deadline:
@@ -102,32 +145,249 @@ class OpenRGBBackend:
 
     def get_led_map(self):
         """
-        Returns a list of metadata dicts for each LED in global order.
+        Returns a LedMap covering every LED in global order, with x/y
+        coordinates from the saved layout.
         """
-        map_data = []
-        global_index = 0
-        for dev_idx, device in enumerate(self.client.devices):
-            num_leds = len(device.leds)
-            for local_index in range(num_leds):
-                map_data.append({
-                    'global_index': global_index,
-                    'device_index': dev_idx,
-                    'device_name': device.name,
-                    'local_index': local_index,
-                    'device_total': num_leds
-                })
-                global_index += 1
-        return map_data
+        if self.led_map is None:
+            self._install(self.client)
+        return self.led_map
+
+    def _prepare(self, client):
+        # Builds the registry, map and writers for a client. Opens sockets, so
+        # it runs without the lock; push_frame keeps using the old ones meanwhile
+        registry = DeviceRegistry()
+        registry.version = self.registry.version
+        registry.update_from(client)
+        led_map = LayoutManager().apply(LedMap(registry.led_specs()))
+        return (registry, led_map) + self._build_writer(registry, led_map)
+
+    def _discard(self, prepared):
+        _, _, writer, senders, _ = prepared
+        if writer:
+            writer.close()
+        for sender in senders:
+            sender.close()
+
+    def _install(self, client):
+        prepared = self._prepare(client)
+        with self._lock:
+            old = self._swap_in(client, prepared)
+        self._discard(old)
+
+    def _swap_in(self, client, prepared):
+        # Callers hold the lock and _discard() what this returns once they let go
+        registry, led_map, writer, senders, slow_devices = prepared
+        old_writer, old_senders = self.writer, self.senders
+        self.client = client
+        self.registry = registry
+        self.led_map = led_map
+        self.writer = writer
+        self.frame_filter = DuplicateFilter(self.keepalive)
+        self.senders = senders
+        self.slow_devices = slow_devices
+        self.map_version += 1
+        wake() # Let a parked render loop pick up the new map
+        return (None, None, old_writer, old_senders, None)
+
+    def _build_writer(self, registry, led_map):
+        # Devices in a per-LED mode take raw UpdateLEDs packets, the rest
+        # (mode-specific colors) still go through the client
+        direct = []
+        slow_devices = []
+        for info, entry in zip(registry, led_map.devices):
+            if info.per_led and self.fast_path:
+                direct.append(entry)
+            else:
+                slow_devices.append((info.device, entry.slice, DuplicateFilter(self.keepalive)))
+
+        writer = None
+        senders = []
+        if self.fast_path and self.per_device:
+            for entry in direct:
+                if entry.count:
+                    name = self.device_prefix + entry.name
+                    limit = lambda name=name: self.rate_limits.get(name)
+                    senders.append(DeviceSender(self.host, self.port, entry.index, entry.slice, name, limit,
+                                                self.keepalive))
+        elif direct:
+            writer = FrameWriter(open_sdk_socket(self.host, self.port), [(e.index, e.slice) for e in direct])
+        return writer, senders, slow_devices
 
     def push_frame(self, frame):
-        i = 0
-        for device in self.client.devices:
-            leds = device.leds
-            colors = []
-            for _ in leds:
-                if i < len(frame):
-                    r, g, b = frame[i]
-                    colors.append(RGBColor(r, g, b))
-                i += 1
-            if colors:
-                device.set_colors(colors)
+        if not self.connected:
+            # Reconnect in progress, drop the frame
+            return
+
+        try:
+            if self.led_map is None:
+                self._install(self.client)
+            with self._lock:
+                self._send(frame)
+        except Exception as e:
+            print(f"OpenRGB connection lost: {e}")
+            self._start_reconnect()
+            return
+
+        # The senders read server notifications while waiting for their acks
+        if any(sender.device_list_updated for sender in self.senders):
+            for sender in self.senders:
+                sender.device_list_updated = False
+            self.refresh_devices()
+
+    def _send(self, frame):
+        frame = np.asarray(frame, dtype=np.uint8).reshape(-1, 3)
+        if len(frame) < len(self.led_map):
+            padded = np.zeros((len(self.led_map), 3), dtype=np.uint8)
+            padded[:len(frame)] = frame
+            frame = padded
+
+        if self.writer and self.frame_filter.should_send(frame):
+            self.writer.write(frame)
+        for sender in self.senders:
+            if sender.error:
+                raise sender.error
+            sender.submit(frame)
+
+        # fast=True: don't re-download the controller data after every update
+        for device, s, dedup in self.slow_devices:
+            if s.stop > s.start and dedup.should_send(frame[s]):
+                device.set_colors([RGBColor(int(r), int(g), int(b)) for r, g, b in frame[s].tolist()], fast=True)
+
+    def refresh_devices(self):
+        """
+        Re-downloads the device list in the background and swaps in the new
+        registry and LED map. Frames keep flowing on the old map meanwhile.
+        """
+        if self._closed or not self.connected:
+            return
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return
+        self._refresh_thread = threading.Thread(target=self._refresh_worker, daemon=True)
+        self._refresh_thread.start()
+
+    def _refresh_worker(self):
+        try:
+            client = OpenRGBClient(address=self.host, port=self.port)
+        except Exception as e:
+            print(f"OpenRGB device refresh failed: {e}")
+            return
+        try:
+            prepared = self._prepare(client)
+        except Exception as e:
+            print(f"OpenRGB device refresh failed: {e}")
+            client.disconnect()
+            return
+        with self._lock:
+            if self._closed or not self.connected:
+                # Closed, or a reconnect took over and rebuilds everything itself
+                self._discard(prepared)
+                client.disconnect()
+                return
+            old_client = self.client
+            old = self._swap_in(client, prepared)
+        self._discard(old)
+        try:
+            old_client.disconnect()
+        except Exception:
+            pass
+        print(f"OpenRGB device list refreshed ({len(self.registry)} devices, {len(self.led_map)} LEDs)")
+
+    def reconnect(self, host=None, port=None):
+        """
+        Drops the current connection and reconnects in the background,
+        optionally to a different server.
+        """
+        if host is not None:
+            self.host = host
+        if port is not None:
+            self.port = int(port)
+        self._start_reconnect()
+
+    def _start_reconnect(self):
+        self.connected = False
+        if self._closed:
+            return
+        if self._reconnect_thread and self._reconnect_thread.is_alive():
+            return
+        self._reconnect_thread = threading.Thread(target=self._reconnect_worker, daemon=True)
+        self._reconnect_thread.start()
+
+    def _reconnect_worker(self):
+        delay = self.RECONNECT_MIN_S
+        self._disconnect()
+
+        while not self._closed:
+            try:
+                client = OpenRGBClient(address=self.host, port=self.port)
+                prepared = self._prepare(client)
+                with self._lock:
+                    closed = self._closed
+                    if not closed:
+                        old = self._swap_in(client, prepared)
+                        self.connected = True
+                if closed:
+                    self._discard(prepared)
+                    client.disconnect()
+                    return
+                self._discard(old)
+                print(f"Reconnected to OpenRGB at {self.host}:{self.port} ({len(self.led_map)} LEDs)")
+                return
+            except Exception as e:
+                print(f"OpenRGB reconnect failed, retrying in {delay:.1f}s: {e}")
+            time.sleep(delay)
+            delay = min(delay * 2, self.RECONNECT_MAX_S)
+
+    def device_stats(self):
+        """
+        Per-device send statistics: achieved fps, frames sent, frames
+        replaced before they could be sent and the share of unchanged frames.
+        """
+        return [{'index': s.device_index, 'name': s.name, 'fps': s.fps, 'sent': s.sent,
+                 'dropped': s.dropped, 'max_fps': s.current_limit(),
+                 'duplicate_ratio': s.filter.duplicate_ratio} for s in self.senders]
+
+    def frame_layout(self, offset=0):
+        """
+        Where each per-LED device's colors sit in the frame, so a saved
+        frame can be replayed without a client (see first_light).
+        """
+        led_map = self.led_map
+        if led_map is None or not self.connected:
+            return []
+        devices = [[entry.index, offset + entry.offset, offset + entry.offset + entry.count]
+                   for info, entry in zip(self.registry, led_map.devices) if info.per_led and entry.count]
+        return [{'host': self.host, 'port': self.port, 'device_count': len(self.registry), 'devices': devices}]
+
+    def frame_stats(self):
+        """
+        Totals over every output path: updates sent and unchanged frames
+        that were skipped.
+        """
+        filters = [sender.filter for sender in self.senders] + [dedup for _, _, dedup in self.slow_devices]
+        if self.writer and self.frame_filter:
+            filters.append(self.frame_filter)
+        sent = sum(f.sent for f in filters)
+        duplicates = sum(f.duplicates for f in filters)
+        total = sent + duplicates
+        return {'sent': sent, 'duplicates': duplicates, 'duplicate_ratio': duplicates / total if total else 0.0}
+
+    def _disconnect(self):
+        # Closing joins the sender threads, so only the swap happens under the lock
+        with self._lock:
+            writer, senders, client = self.writer, self.senders, self.client
+            self.writer = None
+            self.senders = []
+            self.slow_devices = []
+        if writer:
+            writer.close()
+        for sender in senders:
+            sender.close()
+        try:
+            client.disconnect()
+        except Exception:
+            pass
+
+    def close(self):
+        self._closed = True
+        self.connected = False
+        self._disconnect()
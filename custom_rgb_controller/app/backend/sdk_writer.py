@@ -0,0 +1,241 @@
+import collections
+import socket
+import struct
+import threading
+import time
+import numpy as np
+
+# OpenRGB SDK packet header: magic, device index, packet id, payload size
+HEADER = struct.Struct('<4sIII')
+MAGIC = b'ORGB'
+
+PKT_REQUEST_PROTOCOL_VERSION = 40
+PKT_SET_CLIENT_NAME = 50
+PKT_DEVICE_LIST_UPDATED = 100
+PKT_UPDATELEDS = 1050
+
+# Protocol version the SDK server is asked for when a reply is only used as an ack
+ACK_PROTOCOL_VERSION = 4
+
+def open_sdk_socket(host, port, client_name="ARES", timeout=2.0):
+    """
+    Opens a raw SDK connection and registers a client name. UpdateLEDs needs
+    no protocol negotiation and the server never replies to it.
+    """
+    sock = socket.create_connection((host, int(port)), timeout=timeout)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    name = client_name.encode('utf-8') + b'\0'
+    sock.sendall(HEADER.pack(MAGIC, 0, PKT_SET_CLIENT_NAME, len(name)) + name)
+    return sock
+
+def recv_exact(sock, size):
+    buf = bytearray(size)
+    view = memoryview(buf)
+    got = 0
+    while got < size:
+        n = sock.recv_into(view[got:])
+        if n == 0:
+            raise ConnectionError("OpenRGB server closed the connection")
+        got += n
+    return bytes(buf)
+
+def probe_server(host, port, timeout=0.5):
+    """
+    Cheap readiness check: TCP connect plus a protocol version request.
+    Unlike a full client it doesn't download every controller's data.
+    """
+    try:
+        with socket.create_connection((host, int(port)), timeout=timeout) as sock:
+            version = struct.pack('<I', ACK_PROTOCOL_VERSION)
+            sock.sendall(HEADER.pack(MAGIC, 0, PKT_REQUEST_PROTOCOL_VERSION, len(version)) + version)
+            magic, _, packet_id, size = HEADER.unpack(recv_exact(sock, HEADER.size))
+            return magic == MAGIC and packet_id == PKT_REQUEST_PROTOCOL_VERSION
+    except (OSError, struct.error):
+        return False
+
+class FrameWriter:
+    """
+    Builds RGBController UpdateLEDs packets for every device straight from a
+    (count, 3) uint8 frame. All packets live in one preallocated bytearray;
+    each frame only copies colors into it and goes out in a single send.
+
+    devices: list of (device_index, slice into the global frame)
+    """
+    def __init__(self, sock, devices):
+        self.sock = sock
+        self.devices = [(idx, s) for idx, s in devices if s.stop > s.start]
+
+        # Packet per device: header, data_size (I), num_colors (H), RGBx * n
+        size = sum(HEADER.size + 6 + 4 * (s.stop - s.start) for _, s in self.devices)
+        self.buffer = bytearray(size)
+        self.views = []
+
+        offset = 0
+        for idx, s in self.devices:
+            count = s.stop - s.start
+            data_size = 6 + 4 * count
+            HEADER.pack_into(self.buffer, offset, MAGIC, idx, PKT_UPDATELEDS, data_size)
+            struct.pack_into('<IH', self.buffer, offset + HEADER.size, data_size, count)
+            colors = np.frombuffer(self.buffer, dtype=np.uint8, count=4 * count,
+                                   offset=offset + HEADER.size + 6).reshape(count, 4)
+            self.views.append((colors, s))
+            offset += HEADER.size + data_size
+
+        self.packet = memoryview(self.buffer)
+
+    def write(self, frame):
+        for colors, s in self.views:
+            colors[:, :3] = frame[s]
+        self.sock.sendall(self.packet)
+
+    def close(self):
+        # Release buffer exports before the socket goes away
+        self.views = []
+        self.packet.release()
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+class DuplicateFilter:
+    """
+    Skips frames identical to the last one sent. An unchanged frame is still
+    re-sent every keepalive seconds so devices that fall back to their
+    hardware effect after a timeout stay on ours; keepalive 0 turns the
+    filter off. keepalive may be a number or a callable returning one.
+    """
+    def __init__(self, keepalive=1.0):
+        self.keepalive = keepalive
+        self.last = None
+        self.last_send = 0.0
+        self.sent = 0
+        self.duplicates = 0
+
+    def should_send(self, frame):
+        interval = self.keepalive() if callable(self.keepalive) else self.keepalive
+        now = time.perf_counter()
+        if interval and self.last is not None and self.last.shape == frame.shape:
+            if now - self.last_send < interval and np.array_equal(self.last, frame):
+                self.duplicates += 1
+                return False
+            self.last[:] = frame
+        else:
+            self.last = np.array(frame, dtype=np.uint8)
+        self.last_send = now
+        self.sent += 1
+        return True
+
+    @property
+    def duplicate_ratio(self):
+        total = self.sent + self.duplicates
+        return self.duplicates / total if total else 0.0
+
+class DeviceSender:
+    """
+    Sends one device's colors on its own SDK connection and thread, so a
+    slow controller (e.g. RAM over SMBus) never holds up the others.
+
+    submit() only copies the device's slice into a pending buffer; if the
+    sender is still busy the previous pending frame is replaced (latest
+    frame wins). max_fps, read on every send, caps the update rate, and
+    frames identical to the last one are filtered out (see DuplicateFilter).
+
+    UpdateLEDs has no reply, so each update is followed by a protocol
+    version request. The server handles a connection's packets in order,
+    so its reply means the update was applied. Without it, frames for a
+    slow device would queue up in socket buffers instead of being skipped.
+    """
+    def __init__(self, host, port, device_index, region, name="", max_fps=None, keepalive=1.0):
+        self.device_index = device_index
+        self.region = region
+        self.name = name
+        self.max_fps = max_fps # Number, callable returning a number, or None
+        self.filter = DuplicateFilter(keepalive)
+        self.error = None
+
+        self.writer = FrameWriter(open_sdk_socket(host, port), [(device_index, slice(0, region.stop - region.start))])
+        version = struct.pack('<I', ACK_PROTOCOL_VERSION)
+        self.ack_packet = HEADER.pack(MAGIC, 0, PKT_REQUEST_PROTOCOL_VERSION, len(version)) + version
+        self.device_list_updated = False
+        self.pending = np.zeros((region.stop - region.start, 3), dtype=np.uint8)
+        self.sending = self.pending.copy()
+        self.has_pending = False
+
+        self.submitted = 0
+        self.sent = 0
+        self.send_times = collections.deque(maxlen=60)
+
+        self.cond = threading.Condition()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, frame):
+        if not self.filter.should_send(frame[self.region]):
+            return
+        with self.cond:
+            self.pending[:] = frame[self.region]
+            self.has_pending = True
+            self.submitted += 1
+            self.cond.notify()
+
+    def current_limit(self):
+        limit = self.max_fps() if callable(self.max_fps) else self.max_fps
+        return float(limit) if limit else 0.0
+
+    def _run(self):
+        last_send = 0.0
+        try:
+            while True:
+                limit = self.current_limit()
+                if limit > 0:
+                    wait = last_send + 1.0 / limit - time.perf_counter()
+                    if wait > 0:
+                        time.sleep(wait)
+
+                with self.cond:
+                    while self.running and not self.has_pending:
+                        self.cond.wait()
+                    # On close, still deliver the last frame (e.g. all-off)
+                    if not self.has_pending:
+                        return
+                    self.pending, self.sending = self.sending, self.pending
+                    self.has_pending = False
+
+                self.writer.write(self.sending)
+                self._wait_ack()
+                last_send = time.perf_counter()
+                self.sent += 1
+                self.send_times.append(last_send)
+        except Exception as e:
+            self.error = e
+
+    def _wait_ack(self):
+        sock = self.writer.sock
+        sock.sendall(self.ack_packet)
+        while True:
+            _, _, packet_id, size = HEADER.unpack(recv_exact(sock, HEADER.size))
+            if size:
+                recv_exact(sock, size)
+            if packet_id == PKT_REQUEST_PROTOCOL_VERSION:
+                return
+            if packet_id == PKT_DEVICE_LIST_UPDATED:
+                self.device_list_updated = True
+
+    @property
+    def fps(self):
+        times = list(self.send_times)
+        if len(times) < 2 or time.perf_counter() - times[-1] > 1.0:
+            return 0.0
+        return (len(times) - 1) / max(1e-6, times[-1] - times[0])
+
+    @property
+    def dropped(self):
+        return max(0, self.submitted - self.sent)
+
+    def close(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        self.thread.join(timeout=1.0)
+        self.writer.close()
@@ -0,0 +1,101 @@
+import threading
+from app.engine.waker import wake
+
+class NullBackend:
+    def push_frame(self, frame):
+        return
+
+class BackendSwitch:
+    """
+    Stable backend handle given to the render loop and the pages. It starts
+    on a NullBackend and is pointed at the live backend once that is ready;
+    everything else is forwarded to the current target.
+    """
+    def __init__(self, target=None):
+        self.target = target if target is not None else NullBackend()
+        self.generation = 0
+
+    def set_target(self, target):
+        self.target = target
+        self.generation += 1
+        wake()
+
+    @property
+    def live(self):
+        return not isinstance(self.target, NullBackend)
+
+    @property
+    def led_map(self):
+        return getattr(self.target, 'led_map', None)
+
+    @property
+    def map_version(self):
+        # Changes on every switch as well as on the target's own map changes
+        return (self.generation, getattr(self.target, 'map_version', 0))
+
+    def push_frame(self, frame):
+        self.target.push_frame(frame)
+
+    def __getattr__(self, name):
+        # Only reached for attributes not defined above
+        return getattr(self.target, name)
+
+class BackendStarter(threading.Thread):
+    """
+    Connects to OpenRGB off the GUI thread: probes the server with a raw
+    handshake, launches a local OpenRGB if needed, then builds the backend
+    and its LED map and hands it to on_ready. on_status receives
+    'connecting', 'ready', 'not_installed' or 'failed'.
+    """
+    def __init__(self, global_settings, on_ready, on_status=None):
+        super().__init__(daemon=True)
+        self.global_settings = global_settings
+        self.on_ready = on_ready
+        self.on_status = on_status or (lambda status: None)
+        self.openrgb_process = None
+
+    def run(self):
+        # Imported here so the window can show before openrgb-python loads
+        try:
+            from app.backend.openrgb_backend import OpenRGBBackend
+            from app.backend.composite_backend import CompositeBackend, parse_servers
+        except ImportError as e:
+            print(f"OpenRGB backend unavailable: {e}")
+            self.on_status('failed')
+            return
+
+        settings = self.global_settings
+        host = str(settings.get('openrgb_host', '127.0.0.1'))
+        port = int(settings.get('openrgb_port', 6742))
+        connect_host = "127.0.0.1" if host in ("0.0.0.0", "::") else host
+        rate_limits = settings.setdefault('device_rate_limits', {})
+        keepalive = lambda: float(settings.get('keepalive_interval', 1.0))
+        self.on_status('connecting')
+
+        if not OpenRGBBackend.is_server_running(connect_host, port):
+            if connect_host in ("127.0.0.1", "localhost") and not OpenRGBBackend.is_installed():
+                self.on_status('not_installed')
+                return
+            wait_s = float(settings.get('openrgb_start_timeout', 15.0))
+            self.openrgb_process = OpenRGBBackend.ensure_server_running(host, port, wait_s=wait_s)
+
+        try:
+            # Extra servers on other machines extend the same LED map
+            servers = parse_servers([f"{connect_host}:{port}"] + settings.get('openrgb_servers', []))
+            if len(servers) > 1:
+                backend = CompositeBackend(servers, rate_limits=rate_limits, keepalive=keepalive)
+            elif OpenRGBBackend.is_server_running(connect_host, port):
+                backend = OpenRGBBackend(host=connect_host, port=port, rate_limits=rate_limits, keepalive=keepalive)
+            else:
+                # Keep retrying in the background; frames are dropped until then
+                backend = OpenRGBBackend(host=connect_host, port=port, rate_limits=rate_limits, keepalive=keepalive,
+                                         connect=False)
+            if backend.connected:
+                backend.get_led_map()
+        except Exception as e:
+            print(f"OpenRGB connection failed: {e}")
+            self.on_status('failed')
+            return
+
+        self.on_ready(backend)
+        self.on_status('ready')
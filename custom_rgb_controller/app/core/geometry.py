@@ -0,0 +1,97 @@
+import numpy as np
+
+def _readonly(arr):
+    arr.setflags(write=False)
+    return arr
+
+def _normalize(values):
+    lo = float(values.min())
+    span = float(values.max()) - lo
+    if span <= 0:
+        return np.zeros(len(values))
+    return (values - lo) / span
+
+class LedGeometry:
+    """
+    Per-LED position arrays shared by every layer. Built once per LED map
+    (or layout) change; all arrays are read-only.
+
+    index:           global LED index
+    position:        index / count, the normalized strip position
+    local:           LED index within its device
+    x, y:            layout coordinates (strip index and 0 without a layout)
+    x_norm, y_norm:  coordinates scaled to 0..1 over the layout bounds
+    center_distance: 0 at the center, 1 at the furthest LED
+    """
+    def __init__(self, count, local=None, x=None, y=None, version=0):
+        self.count = count
+        self.version = version
+
+        self.index = _readonly(np.arange(count))
+        self.position = _readonly(self.index / max(1, count))
+        self.local = _readonly(np.asarray(local if local is not None else self.index).copy())
+
+        if x is None or y is None:
+            x = self.index.astype(np.float64)
+            y = np.zeros(count)
+        self.x = _readonly(np.asarray(x, dtype=np.float64).copy())
+        self.y = _readonly(np.asarray(y, dtype=np.float64).copy())
+
+        if count:
+            self.x_norm = _readonly(_normalize(self.x))
+            self.y_norm = _readonly(_normalize(self.y))
+            dx = self.x - (self.x.min() + self.x.max()) / 2
+            dy = self.y - (self.y.min() + self.y.max()) / 2
+            dist = np.sqrt(dx * dx + dy * dy)
+            far = float(dist.max())
+            self.center_distance = _readonly(dist / far if far > 0 else dist)
+        else:
+            self.x_norm = self.y_norm = self.center_distance = self.position
+
+    @classmethod
+    def from_led_map(cls, led_map, region=None):
+        if region is None:
+            region = slice(0, len(led_map))
+        count = region.stop - region.start
+        return cls(count, led_map.local_index[region], led_map.x[region], led_map.y[region], led_map.layout_version)
+
+    def slice(self, region):
+        """
+        Returns a view of this geometry for a sub-range of LEDs. Unlike a
+        region geometry from the LED map, coordinates keep their global
+        normalization, so a slice renders exactly like its part of the whole.
+        """
+        geometry = LedGeometry.__new__(LedGeometry)
+        geometry.count = region.stop - region.start
+        geometry.version = self.version
+        for name in ('index', 'position', 'local', 'x', 'y', 'x_norm', 'y_norm', 'center_distance'):
+            setattr(geometry, name, getattr(self, name)[region])
+        return geometry
+
+    def axis(self, name):
+        """
+        Returns the 0..1 coordinate a layer should sweep along.
+        """
+        if name == 'Horizontal':
+            return self.x_norm
+        if name == 'Vertical':
+            return self.y_norm
+        if name == 'Radial':
+            return self.center_distance
+        return self.position
+
+# Geometry for plain LED lists (e.g. the preview), keyed by LED count
+_count_cache = {}
+
+def get_geometry(leds):
+    if hasattr(leds, 'geometry'):
+        return leds.geometry()
+
+    count = len(leds)
+    geometry = _count_cache.get(count)
+    if geometry is None:
+        if len(_count_cache) > 16:
+            _count_cache.clear()
+        geometry = LedGeometry(count)
+        _count_cache[count] = geometry
+    return geometry
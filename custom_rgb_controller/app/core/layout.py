@@ -0,0 +1,220 @@
+import json
+import math
+import os
+import numpy as np
+from app.path_utils import get_app_root
+
+class SpatialIndex:
+    """
+    Uniform grid over LED coordinates. Cells hold runs of a sorted index
+    array, so a query only touches the cells that overlap it.
+    """
+    def __init__(self, x, y, cell_size=None, version=0):
+        self.version = version
+        self.x = np.asarray(x, dtype=np.float32)
+        self.y = np.asarray(y, dtype=np.float32)
+        count = len(self.x)
+
+        if count == 0:
+            self.x0 = self.y0 = 0.0
+            self.cell_size = 1.0
+            self.order = np.zeros(0, dtype=np.int64)
+            self.cells = {}
+            return
+
+        self.x0 = float(self.x.min())
+        self.y0 = float(self.y.min())
+        if cell_size is None:
+            # Aim for a handful of LEDs per cell
+            width = float(self.x.max()) - self.x0
+            height = float(self.y.max()) - self.y0
+            area = max(width, 1.0) * max(height, 1.0)
+            cell_size = max(1.0, math.sqrt(area / count) * 2)
+        self.cell_size = float(cell_size)
+
+        cx = ((self.x - self.x0) // self.cell_size).astype(np.int64)
+        cy = ((self.y - self.y0) // self.cell_size).astype(np.int64)
+        self.rows = int(cy.max()) + 1
+        keys = cx * self.rows + cy
+
+        self.order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[self.order]
+        unique, starts = np.unique(sorted_keys, return_index=True)
+        ends = np.append(starts[1:], len(sorted_keys))
+        self.cells = {int(k): (int(s), int(e)) for k, s, e in zip(unique, starts, ends)}
+
+    def _cell(self, x, y):
+        return (int((x - self.x0) // self.cell_size), int((y - self.y0) // self.cell_size))
+
+    def query_rect(self, x0, y0, x1, y1):
+        """
+        Returns global LED indices inside the axis-aligned rectangle.
+        """
+        if not self.cells:
+            return np.zeros(0, dtype=np.int64)
+
+        cx0, cy0 = self._cell(min(x0, x1), min(y0, y1))
+        cx1, cy1 = self._cell(max(x0, x1), max(y0, y1))
+        cy0 = max(cy0, 0)
+        cy1 = min(cy1, self.rows - 1)
+
+        runs = []
+        for cx in range(max(cx0, 0), cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                run = self.cells.get(cx * self.rows + cy)
+                if run:
+                    runs.append(self.order[run[0]:run[1]])
+        if not runs:
+            return np.zeros(0, dtype=np.int64)
+
+        idx = np.concatenate(runs)
+        px, py = self.x[idx], self.y[idx]
+        inside = (px >= min(x0, x1)) & (px <= max(x0, x1)) & (py >= min(y0, y1)) & (py <= max(y0, y1))
+        return np.sort(idx[inside])
+
+    def neighbors(self, x, y, radius):
+        """
+        Returns global LED indices within radius of (x, y).
+        """
+        idx = self.query_rect(x - radius, y - radius, x + radius, y + radius)
+        dx = self.x[idx] - x
+        dy = self.y[idx] - y
+        return idx[dx * dx + dy * dy <= radius * radius]
+
+    def neighbors_of(self, index, radius):
+        return self.neighbors(float(self.x[index]), float(self.y[index]), radius)
+
+class LocalSpatialIndex:
+    """
+    View of a SpatialIndex for a buffer covering LEDs [offset, offset +
+    count): queries only return LEDs in that range, as buffer indices.
+    """
+    def __init__(self, index, offset, count):
+        self.index = index
+        self.offset = offset
+        self.count = count
+
+    def _local(self, idx):
+        idx = idx - self.offset
+        return idx[(idx >= 0) & (idx < self.count)]
+
+    def query_rect(self, x0, y0, x1, y1):
+        return self._local(self.index.query_rect(x0, y0, x1, y1))
+
+    def neighbors(self, x, y, radius):
+        return self._local(self.index.neighbors(x, y, radius))
+
+    def neighbors_of(self, index, radius):
+        return self._local(self.index.neighbors_of(index + self.offset, radius))
+
+def _device_local_positions(device):
+    """
+    Lays out one device in its own coordinate space. Matrix zones use the
+    OpenRGB matrix map, everything else is a straight line. Zones are stacked
+    top to bottom with a one row gap.
+    """
+    x = np.zeros(device.count, dtype=np.float32)
+    y = np.zeros(device.count, dtype=np.float32)
+    row = 0
+
+    for zone in device.zones:
+        start = zone.offset - device.offset
+        placed = np.zeros(zone.count, dtype=bool)
+        height = 0
+
+        if zone.matrix_map:
+            for r, cols in enumerate(zone.matrix_map):
+                for c, led in enumerate(cols):
+                    if led is None or not 0 <= led < zone.count:
+                        continue
+                    x[start + led] = c
+                    y[start + led] = row + r
+                    placed[led] = True
+            height = len(zone.matrix_map)
+
+        # LEDs without a matrix cell go on a line below the matrix
+        rest = np.flatnonzero(~placed)
+        if len(rest):
+            x[start + rest] = np.arange(len(rest))
+            y[start + rest] = row + height
+            height += 1
+
+        row += height + 1
+
+    return x, y
+
+class LayoutManager:
+    """
+    Assigns x/y coordinates to every LED in a LedMap. Devices can be placed
+    by the user (offset, rotation, scale) through layout.json, devices without
+    a placement are stacked below each other. Placements are keyed by device
+    name and index, so identical devices can sit in different places.
+    """
+    def __init__(self, layout_file=None):
+        if layout_file is None:
+            layout_file = os.path.join(get_app_root(), "layout.json")
+        self.layout_file = layout_file
+        self.placements = {}
+        self.load()
+
+    def load(self):
+        self.placements = {}
+        if os.path.exists(self.layout_file):
+            try:
+                with open(self.layout_file, 'r') as f:
+                    self.placements = json.load(f).get('devices', {})
+            except Exception as e:
+                print(f"Error loading layout: {e}")
+
+    def save(self):
+        try:
+            with open(self.layout_file, 'w') as f:
+                json.dump({'devices': self.placements}, f, indent=4)
+        except Exception as e:
+            print(f"Error saving layout: {e}")
+
+    @staticmethod
+    def placement_key(device_name, index):
+        return f"{device_name}#{index}"
+
+    def get_placement(self, device_name, index):
+        # Older layout files keyed placements by name only
+        key = self.placement_key(device_name, index)
+        return self.placements.get(key, self.placements.get(device_name))
+
+    def set_placement(self, device_name, index, x=0.0, y=0.0, rotation=0.0, scale=1.0):
+        # Replaced, not updated: apply() may read it from the render thread
+        self.placements[self.placement_key(device_name, index)] = {
+            'x': float(x),
+            'y': float(y),
+            'rotation': float(rotation),
+            'scale': float(scale)
+        }
+
+    def apply(self, led_map):
+        x = np.zeros(len(led_map), dtype=np.float32)
+        y = np.zeros(len(led_map), dtype=np.float32)
+        next_row = 0.0
+
+        for device in led_map.devices:
+            if device.count == 0:
+                continue
+            lx, ly = _device_local_positions(device)
+            placement = self.get_placement(device.name, device.index)
+
+            if placement:
+                scale = placement.get('scale', 1.0)
+                angle = math.radians(placement.get('rotation', 0.0))
+                cos_a, sin_a = math.cos(angle), math.sin(angle)
+                px = (lx * cos_a - ly * sin_a) * scale + placement.get('x', 0.0)
+                py = (lx * sin_a + ly * cos_a) * scale + placement.get('y', 0.0)
+            else:
+                px = lx
+                py = ly + next_row
+                next_row = float(py.max()) + 2
+
+            x[device.slice] = px
+            y[device.slice] = py
+
+        led_map.set_positions(x, y)
+        return led_map
@@ -1,5 +1,228 @@
+import numpy as np
+
 class LogicalLED:
     def __init__(self, id, x, y):
         self.id = id
         self.x = x
         self.y = y
+
+# One record per LED, in global order. Global index is the row number.
+LED_DTYPE = np.dtype([
+    ('device', np.int32),
+    ('zone', np.int32),
+    ('local', np.int32),
+    ('x', np.float32),
+    ('y', np.float32),
+])
+
+class ZoneEntry:
+    def __init__(self, index, name, offset, count, matrix_map=None):
+        self.index = index
+        self.name = name
+        self.offset = offset # Global index of the first LED
+        self.count = count
+        self.matrix_map = matrix_map # Rows of zone-local LED indices (None = gap)
+
+    @property
+    def slice(self):
+        return slice(self.offset, self.offset + self.count)
+
+class DeviceEntry:
+    def __init__(self, index, name, offset, count, zones=None):
+        self.index = index
+        self.name = name
+        self.offset = offset # Global index of the first LED
+        self.count = count
+        self.zones = zones or []
+
+    @property
+    def slice(self):
+        return slice(self.offset, self.offset + self.count)
+
+class LedMap:
+    """
+    Compact LED map: one structured array row per LED plus a device table.
+    Device and zone lookups are plain slices into the global LED order.
+    """
+    def __init__(self, specs=None):
+        # specs: list of (device_name, [(zone_name, led_count[, matrix_map]), ...])
+        self.devices = []
+        self.layout_version = 0
+        self._spatial_index = None
+        self._geometry = None
+        self._region_geometry = {}
+        specs = specs or []
+
+        total = sum(int(zone[1]) for _, zones in specs for zone in zones)
+        self.leds = np.zeros(total, dtype=LED_DTYPE)
+
+        offset = 0
+        for dev_idx, (name, zones) in enumerate(specs):
+            device = DeviceEntry(dev_idx, name, offset, 0)
+            for zone_idx, zone in enumerate(zones):
+                zone_name, count = zone[0], int(zone[1])
+                matrix_map = zone[2] if len(zone) > 2 else None
+                device.zones.append(ZoneEntry(zone_idx, zone_name, offset, count, matrix_map))
+                rows = self.leds[offset:offset + count]
+                rows['device'] = dev_idx
+                rows['zone'] = zone_idx
+                rows['local'] = np.arange(device.count, device.count + count)
+                offset += count
+                device.count += count
+            self.devices.append(device)
+
+        # Default placement: each device is a horizontal row of LEDs
+        self.leds['x'] = self.leds['local']
+        self.leds['y'] = self.leds['device']
+
+        # Device start offsets, used to map a global index back to its device
+        self.offsets = np.array([d.offset for d in self.devices], dtype=np.int64)
+
+    @classmethod
+    def from_count(cls, count, name="Virtual Strip"):
+        return cls([(name, [(name, count)])])
+
+    @classmethod
+    def from_openrgb(cls, devices):
+        """
+        Builds the map from openrgb-python Device objects.
+        """
+        specs = []
+        for device in devices:
+            zones = [(zone.name, len(zone.leds), getattr(zone, 'matrix_map', None)) for zone in device.zones]
+            if sum(zone[1] for zone in zones) != len(device.leds):
+                # Zone data doesn't cover the device, treat it as one zone
+                zones = [(device.name, len(device.leds))]
+            specs.append((device.name, zones))
+        return cls(specs)
+
+    @classmethod
+    def merge(cls, maps, prefixes=None):
+        """
+        Concatenates several maps (e.g. one per OpenRGB server) into one
+        global order. Device names get the matching prefix, if any.
+        """
+        specs = []
+        for i, led_map in enumerate(maps):
+            prefix = prefixes[i] if prefixes else ""
+            for device in led_map.devices:
+                zones = [(zone.name, zone.count, zone.matrix_map) for zone in device.zones]
+                specs.append((prefix + device.name, zones))
+        return cls(specs)
+
+    def __len__(self):
+        return len(self.leds)
+
+    def __getitem__(self, index):
+        row = self.leds[index]
+        return LogicalLED(int(index), float(row['x']), float(row['y']))
+
+    @property
+    def device_index(self):
+        return self.leds['device']
+
+    @property
+    def local_index(self):
+        return self.leds['local']
+
+    @property
+    def x(self):
+        return self.leds['x']
+
+    @property
+    def y(self):
+        return self.leds['y']
+
+    def set_positions(self, x, y):
+        self.leds['x'] = x
+        self.leds['y'] = y
+        self.layout_version += 1
+
+    def spatial_index(self):
+        """
+        Returns a grid index over the current coordinates, rebuilt lazily
+        whenever the layout changes.
+        """
+        from app.core.layout import SpatialIndex
+        index = self._spatial_index
+        if index is None or index.version != self.layout_version:
+            index = SpatialIndex(self.x, self.y, version=self.layout_version)
+            self._spatial_index = index
+        return index
+
+    def geometry(self, region=None):
+        """
+        Returns the cached LedGeometry for the current layout. With a region
+        slice, the geometry covers only those LEDs (positions span 0..1
+        across the region).
+        """
+        from app.core.geometry import LedGeometry
+        if region is None:
+            geometry = self._geometry
+            if geometry is None or geometry.version != self.layout_version:
+                geometry = LedGeometry.from_led_map(self)
+                self._geometry = geometry
+            return geometry
+
+        key = (region.start, region.stop)
+        geometry = self._region_geometry.get(key)
+        if geometry is None or geometry.version != self.layout_version:
+            if len(self._region_geometry) > 64:
+                self._region_geometry.clear()
+            geometry = LedGeometry.from_led_map(self, region)
+            self._region_geometry[key] = geometry
+        return geometry
+
+    def device_slice(self, device_index):
+        if 0 <= device_index < len(self.devices):
+            return self.devices[device_index].slice
+        return slice(0, 0)
+
+    def zone_slice(self, device_index, zone_index):
+        if 0 <= device_index < len(self.devices):
+            zones = self.devices[device_index].zones
+            if 0 <= zone_index < len(zones):
+                return zones[zone_index].slice
+        return slice(0, 0)
+
+    def find_device(self, name):
+        for device in self.devices:
+            if device.name == name:
+                return device
+        return None
+
+    def target_slice(self, target):
+        """
+        Resolves a layer target to a slice of the global LED order.
+        target: None (all LEDs), {'device': name[, 'zone': name]} or
+        {'start': first, 'end': last + 1}. Returns None for all LEDs.
+        """
+        if not target:
+            return None
+
+        if 'start' in target:
+            start = max(0, min(len(self.leds), int(target['start'])))
+            end = max(start, min(len(self.leds), int(target.get('end', len(self.leds)))))
+            return slice(start, end)
+
+        device = self.find_device(target.get('device'))
+        if device is None:
+            return slice(0, 0)
+        zone_name = target.get('zone')
+        if zone_name is None:
+            return device.slice
+        for zone in device.zones:
+            if zone.name == zone_name:
+                return zone.slice
+        return slice(0, 0)
+
+    def device_of(self, global_index):
+        if not 0 <= global_index < len(self.leds):
+            return None
+        # Empty devices share their successor's offset, side='right' skips them
+        idx = int(np.searchsorted(self.offsets, global_index, side='right')) - 1
+        return self.devices[idx]
+
+    @property
+    def nbytes(self):
+        return self.leds.nbytes + self.offsets.nbytes
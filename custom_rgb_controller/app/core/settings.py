@@ -0,0 +1,52 @@
+import json
+import os
+from app.path_utils import get_app_root
+
+DEFAULT_SETTINGS = {
+    'brightness': 1.0, 
+    'identify_device': -1,
+    'fps_limit': 60,
+    'minimize_to_tray': True,
+    'start_minimized': False,
+    'auto_connect': True,
+    'openrgb_host': '127.0.0.1',
+    'openrgb_port': 6742,
+    'theme': 'Dark',
+    'parallel_render': False,
+    'parallel_threshold': 5000,
+    'device_rate_limits': {},
+    'openrgb_servers': [],
+    'keepalive_interval': 1.0,
+    'adaptive_fps': False,
+    'fps_min': 15,
+    'idle_mode': True,
+    'leds_off_on_exit': False,
+    'restore_last_frame': True,
+    'control_api': False, # Always on in headless mode
+    'control_port': 6750
+}
+
+def settings_path():
+    return os.path.join(get_app_root(), 'settings.json')
+
+def load_settings(path=None):
+    """
+    Reads settings.json merged over the defaults. Shared by the GUI and the
+    headless service, neither of which should fail on a broken file.
+    """
+    path = path or settings_path()
+    settings = json.loads(json.dumps(DEFAULT_SETTINGS)) # Fresh nested dicts/lists
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                settings.update(json.load(f))
+        except Exception as e:
+            print(f"Failed to read settings, using defaults: {e}")
+    return settings
+
+def save_settings(settings, path=None):
+    try:
+        with open(path or settings_path(), 'w') as f:
+            json.dump(settings, f, indent=4)
+    except Exception:
+        pass
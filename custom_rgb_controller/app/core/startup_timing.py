@@ -0,0 +1,23 @@
+import time
+
+class StartupTimer:
+    """
+    Records startup milestones as seconds since this module was imported,
+    which main.py does first thing. Each milestone is kept once.
+    """
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks = {}
+
+    def mark(self, name):
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() - self.start
+
+    def has(self, name):
+        return name in self.marks
+
+    def report(self):
+        steps = sorted(self.marks.items(), key=lambda item: item[1])
+        return "Startup: " + ", ".join(f"{name} {t * 1000:.0f} ms" for name, t in steps)
+
+startup_timer = StartupTimer()
@@ -1,8 +1,12 @@
-import soundcard as sc
 import numpy as np
 import threading
 import time
 
+def _soundcard():
+    # soundcard loads the platform audio API on import; only audio layers need it
+    import soundcard
+    return soundcard
+
 class AudioDriver:
     def __init__(self, device_id):
         self.device_id = device_id
@@ -29,6 +33,7 @@ class AudioDriver:
             
     def _run(self):
         try:
+            sc = _soundcard()
             # Use microphones with loopback to capture output
             all_mics = sc.all_microphones(include_loopback=True)
             mic = None
@@ -120,7 +125,7 @@ class AudioManager:
             # key: name, value: id
             devices = {}
             # List all capture devices including loopback
-            for m in sc.all_microphones(include_loopback=True):
+            for m in _soundcard().all_microphones(include_loopback=True):
                 name = m.name
                 if name in devices:
                     name = f"{m.name} ({m.id})"
@@ -1,4 +1,7 @@
 import time
+from app.core.geometry import get_geometry
+from app.core.layout import LocalSpatialIndex
+from app.engine.waker import wake
 
 class CreatorEffect():
     def __init__(self):
@@ -9,9 +12,27 @@ class CreatorEffect():
     
     def add_layer(self, layer):
         self.layers.append(layer)
+        wake()
         
     def clear_layers(self):
         self.layers = []
+        wake()
+
+    def remove_layer(self, index):
+        layer = self.layers.pop(index)
+        wake()
+        return layer
+
+    def move_layer(self, index, new_index):
+        # A new list, so a frame in progress keeps iterating the old order
+        layers = list(self.layers)
+        layers.insert(new_index, layers.pop(index))
+        self.layers = layers
+        wake()
+
+    def set_layers(self, layers):
+        self.layers = list(layers)
+        wake()
         
     def handle_key_event(self, key, pressed):
         if pressed:
@@ -19,24 +40,73 @@ class CreatorEffect():
         else:
             self.active_keys.discard(key)
             
-    def render(self, leds, t):
+    def render(self, leds, t, shard=None):
+        """
+        Renders the layer stack. With a shard slice only those LEDs are
+        rendered (used by the parallel renderer); layers still see global
+        positions, so the shards line up into the same frame.
+        """
+        total = len(leds)
+        if shard is None:
+            shard = slice(0, total)
+        
         # Base buffer: Black
-        buffer = [(0, 0, 0)] * len(leds)
+        buffer = [(0, 0, 0)] * (shard.stop - shard.start)
         
         # Context for layers
+        # Geometry is cached per LED map / layout and shared by all layers
+        geometry = get_geometry(leds)
+        if shard.stop - shard.start != total:
+            geometry = geometry.slice(shard)
         ctx = {
             't': t,
             'leds': leds,
             'keys': self.active_keys,
-            'count': len(leds)
+            'count': len(buffer),
+            'offset': shard.start,
+            'geometry': geometry,
+            'x': geometry.x,
+            'y': geometry.y
         }
         
+        # Spatial index when rendering against a real LED map; queries return
+        # indices into the layer's buffer
+        spatial = leds.spatial_index() if hasattr(leds, 'spatial_index') else None
+        if spatial is not None:
+            ctx['spatial'] = spatial if shard.stop - shard.start == total else LocalSpatialIndex(spatial, shard.start, len(buffer))
+        
         for layer in self.layers:
             if not layer.enabled: continue
             
+            region = None
+            if layer.target and hasattr(leds, 'target_slice'):
+                region = leds.target_slice(layer.target)
+            
             # Each layer processes the buffer
             # Some might be generators (overwrite), some modifiers (blend)
-            buffer = layer.process(buffer, ctx)
+            if region is None:
+                buffer = layer.process(buffer, ctx)
+                continue
+            
+            # Targeted layer: render only the part of its slice inside this
+            # shard and write it back
+            lo = max(region.start, shard.start)
+            hi = min(region.stop, shard.stop)
+            if hi <= lo:
+                continue
+            region_geometry = leds.geometry(region)
+            if hi - lo != region.stop - region.start:
+                region_geometry = region_geometry.slice(slice(lo - region.start, hi - region.start))
+            sub = slice(lo - shard.start, hi - shard.start)
+            sub_ctx = dict(ctx)
+            sub_ctx['count'] = hi - lo
+            sub_ctx['offset'] = lo
+            sub_ctx['geometry'] = region_geometry
+            sub_ctx['x'] = region_geometry.x
+            sub_ctx['y'] = region_geometry.y
+            if spatial is not None:
+                sub_ctx['spatial'] = LocalSpatialIndex(spatial, lo, hi - lo)
+            buffer[sub] = layer.process(buffer[sub], sub_ctx)
             
         return buffer
 
@@ -56,16 +126,31 @@ class CreatorEffect():
                 self.add_layer(layer)
 
 class Layer:
+    audio_reactive = False # Output follows live audio, see FrameRateGovernor
+
     def __init__(self, name="Layer"):
         self.name = name
         self.enabled = True
         self.params = {}
+        self.target = None # None renders across all LEDs, see LedMap.target_slice
         
     def process(self, buffer, ctx):
         return buffer
         
     def set_param(self, key, value):
         self.params[key] = value
+        wake()
+
+    def set_target(self, target):
+        self.target = dict(target) if target else None
+        wake()
+
+    def is_animated(self):
+        """
+        Whether the output changes over time with fixed params. The render
+        loop parks while no enabled layer is animated.
+        """
+        return True
         
     def get_param(self, key, default=None):
         return self.params.get(key, default)
@@ -74,16 +159,20 @@ class Layer:
         # Convert params to serializable format if needed
         # For now assume params are simple types (int, float, str, tuple)
         # JSON handles lists, but tuples become lists. We might need to handle that on load.
-        return {
+        data = {
             'class': self.__class__.__name__,
             'name': self.name,
             'enabled': self.enabled,
             'params': self.params
         }
+        if self.target:
+            data['target'] = dict(self.target)
+        return data
 
     def from_dict(self, data):
         self.name = data.get('name', self.name)
         self.enabled = data.get('enabled', True)
+        self.target = data.get('target')
         
         # Restore params with type correction for tuples vs lists
         if 'params' in data:
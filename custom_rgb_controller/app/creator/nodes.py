@@ -3,7 +3,7 @@ import math
 import random
 import colorsys
 import numpy as np
-from .utils import blend_color, perlin_1d, value_noise_1d
+from .utils import blend_color, perlin_1d, value_noise_1d, make_seed_table
 from .audio_driver import AudioManager
 
 # --- GENERATORS ---
@@ -17,6 +17,9 @@ class SolidColorLayer(Layer):
             'opacity': 1.0
         }
         
+    def is_animated(self):
+        return False
+
     def process(self, buffer, ctx):
         r, g, b = self.params['color']
         
@@ -56,10 +59,14 @@ class GradientLayer(Layer):
             'offset': 0.0,
             'scale': 1.0,
             'type': ('Linear', ['Linear', 'Mirror']),
+            'axis': ('Strip', ['Strip', 'Horizontal', 'Vertical', 'Radial']),
             'blend_mode': ('Normal', ['Normal', 'Add', 'Multiply', 'Screen', 'Overlay', 'Color Dodge', 'Subtract']),
             'opacity': 1.0
         }
 
+    def is_animated(self):
+        return False
+
     def process(self, buffer, ctx):
         count = ctx['count']
         t = ctx['t']
@@ -71,25 +78,31 @@ class GradientLayer(Layer):
         g_type = self.params['type']
         if isinstance(g_type, tuple): g_type = g_type[0]
         
+        axis = self.params.get('axis', 'Strip')
+        if isinstance(axis, tuple): axis = axis[0]
+        
         b_mode = self.params['blend_mode']
         if isinstance(b_mode, tuple): b_mode = b_mode[0]
         opacity = self.params['opacity']
         
+        # Positions come precomputed from the shared geometry cache
+        pos = ctx['geometry'].axis(axis) * scale + offset
+        
+        if g_type == 'Mirror':
+            pos = np.abs((pos % 2.0) - 1.0)
+        else:
+            pos = pos % 1.0
+            
+        colors = np.stack([
+            (c1[0] * (1-pos) + c2[0] * pos).astype(int),
+            (c1[1] * (1-pos) + c2[1] * pos).astype(int),
+            (c1[2] * (1-pos) + c2[2] * pos).astype(int)
+        ], axis=1).tolist()
+        
         out = []
         for i in range(count):
-            pos = (i / max(1, count)) * scale + offset
-            
-            if g_type == 'Mirror':
-                pos = abs((pos % 2.0) - 1.0)
-            else:
-                pos = pos % 1.0
-                
-            r = int(c1[0] * (1-pos) + c2[0] * pos)
-            g = int(c1[1] * (1-pos) + c2[1] * pos)
-            b = int(c1[2] * (1-pos) + c2[2] * pos)
-            
             base = buffer[i]
-            blended = blend_color(base, (r, g, b), b_mode, opacity)
+            blended = blend_color(base, colors[i], b_mode, opacity)
             out.append(blended)
         return out
 
@@ -139,12 +152,16 @@ class WaveLayer(Layer):
             'type': ('sine', ['sine', 'triangle', 'saw', 'square']), 
             'color': (0, 255, 0),
             'direction': ('Forward', ['Forward', 'Backward']),
+            'axis': ('Strip', ['Strip', 'Horizontal', 'Vertical', 'Radial']),
             'offset': 0.0,
             'width': 0.5, # For square wave
             'blend_mode': ('Normal', ['Normal', 'Add', 'Multiply', 'Screen', 'Overlay', 'Color Dodge', 'Subtract']),
             'opacity': 1.0
         }
         
+    def is_animated(self):
+        return self.params.get('speed', 0) != 0
+
     def process(self, buffer, ctx):
         t = ctx['t']
         count = ctx['count']
@@ -159,6 +176,9 @@ class WaveLayer(Layer):
         direction = self.params['direction']
         if isinstance(direction, tuple): direction = direction[0]
         
+        axis = self.params.get('axis', 'Strip')
+        if isinstance(axis, tuple): axis = axis[0]
+        
         b_mode = self.params['blend_mode']
         if isinstance(b_mode, tuple): b_mode = b_mode[0]
         
@@ -168,25 +188,26 @@ class WaveLayer(Layer):
         
         dir_mult = 1 if direction == 'Forward' else -1
         
+        pos = ctx['geometry'].axis(axis)
+        phase = (t * speed * dir_mult) + (pos * freq) + offset_val
+        
+        if wave_type == 'sine':
+            vals = (np.sin(phase * 2 * math.pi) + 1) / 2
+        elif wave_type == 'saw':
+            vals = phase % 1.0
+        elif wave_type == 'triangle':
+            vals = np.abs((phase % 1.0) * 2 - 1)
+        elif wave_type == 'square':
+            vals = np.where((phase % 1.0) < width, 1.0, 0.0)
+        else:
+            vals = np.zeros(count)
+        
+        colors = np.stack([(r*vals).astype(int), (g*vals).astype(int), (b*vals).astype(int)], axis=1).tolist()
+        
         out = []
         for i in range(count):
-            pos = i / max(1, count)
-            phase = (t * speed * dir_mult) + (pos * freq) + offset_val
-            
-            val = 0.0
-            if wave_type == 'sine':
-                val = (math.sin(phase * 2 * math.pi) + 1) / 2
-            elif wave_type == 'saw':
-                val = phase % 1.0
-            elif wave_type == 'triangle':
-                val = abs((phase % 1.0) * 2 - 1)
-            elif wave_type == 'square':
-                val = 1.0 if (phase % 1.0) < width else 0.0
-            
-            nr, ng, nb = int(r*val), int(g*val), int(b*val)
-            
             base = buffer[i]
-            blended = blend_color(base, (nr, ng, nb), b_mode, opacity)
+            blended = blend_color(base, colors[i], b_mode, opacity)
             out.append(blended)
         return out
 
@@ -203,8 +224,13 @@ class NoiseLayer(Layer):
             'blend_mode': ('Normal', ['Normal', 'Add', 'Multiply', 'Screen', 'Overlay', 'Color Dodge', 'Subtract']),
             'opacity': 1.0
         }
-        self.seed = [random.random() for _ in range(256)]
+        # Saved with the layer so value noise looks the same when reloaded
+        self.noise_seed = random.randrange(1 << 30)
+        self.seed = make_seed_table(self.noise_seed)
         
+    def is_animated(self):
+        return self.params.get('speed', 0) != 0
+
     def process(self, buffer, ctx):
         t = ctx['t']
         count = ctx['count']
@@ -225,10 +251,11 @@ class NoiseLayer(Layer):
         
         out = []
         base_offset = t * speed * 10
+        xs = (ctx['geometry'].index * scale + base_offset).tolist()
         
         for i in range(count):
             val = 0.0
-            x = i * scale + base_offset
+            x = xs[i]
             
             if octaves > 1:
                 # Fractal noise
@@ -275,6 +302,17 @@ class NoiseLayer(Layer):
             
         return out
 
+    def to_dict(self):
+        data = super().to_dict()
+        data['noise_seed'] = self.noise_seed
+        return data
+    
+    def from_dict(self, data):
+        super().from_dict(data)
+        if 'noise_seed' in data:
+            self.noise_seed = int(data['noise_seed'])
+            self.seed = make_seed_table(self.noise_seed)
+
 class BreathingLayer(Layer):
     def __init__(self):
         super().__init__("Breathing")
@@ -287,6 +325,9 @@ class BreathingLayer(Layer):
             'opacity': 1.0
         }
 
+    def is_animated(self):
+        return self.params.get('speed', 0) != 0
+
     def process(self, buffer, ctx):
         t = ctx['t']
         count = ctx['count']
@@ -325,6 +366,9 @@ class CheckerboardLayer(Layer):
             'opacity': 1.0
         }
 
+    def is_animated(self):
+        return self.params.get('speed', 0) != 0
+
     def process(self, buffer, ctx):
         t = ctx['t']
         count = ctx['count']
@@ -340,13 +384,13 @@ class CheckerboardLayer(Layer):
         
         offset = t * speed * 10
         
+        # Check pattern
+        pos = ctx['geometry'].index + int(offset)
+        is_c1 = ((pos // size) % 2 == 0).tolist()
+        
         out = []
         for i in range(count):
-            # Check pattern
-            pos = i + int(offset)
-            is_c1 = (pos // size) % 2 == 0
-            
-            color = c1 if is_c1 else c2
+            color = c1 if is_c1[i] else c2
             
             base = buffer[i]
             blended = blend_color(base, color, b_mode, opacity)
@@ -354,6 +398,8 @@ class CheckerboardLayer(Layer):
         return out
 
 class AudioVisualizerLayer(Layer):
+    audio_reactive = True
+
     def __init__(self):
         super().__init__("Audio Visualizer")
         
@@ -4,11 +4,14 @@ import math
 # --- NOISE FUNCTIONS ---
 
 # Pre-compute permutation table for Perlin
+# Fixed seed so every process (parallel render workers) gets the same noise
+PERLIN_SEED = 1337
+_perlin_rng = random.Random(PERLIN_SEED)
 PERLIN_PERM = list(range(256))
-random.shuffle(PERLIN_PERM)
+_perlin_rng.shuffle(PERLIN_PERM)
 PERLIN_PERM += PERLIN_PERM
 # Gradients for 1D: just -1 or 1 (or arbitrary floats)
-PERLIN_GRADS = [random.uniform(-1, 1) for _ in range(256)]
+PERLIN_GRADS = [_perlin_rng.uniform(-1, 1) for _ in range(256)]
 
 def lerp(a, b, t):
     return a + (b - a) * t
@@ -44,6 +47,10 @@ def perlin_1d(x):
     # Perlin 1D theoretical range is [-0.5, 0.5] if grads are normalized
     return (val + 0.5)
 
+def make_seed_table(seed):
+    rng = random.Random(seed)
+    return [rng.random() for _ in range(256)]
+
 def value_noise_1d(x, seed_table):
     idx = int(x) % 256
     next_idx = (idx + 1) % 256
@@ -0,0 +1,117 @@
+import time
+
+def scene_activity(effects, frame_changed):
+    """
+    Classifies the current scene: 'audio' if an enabled layer reacts to
+    sound, 'static' if the rendered frame stopped changing, else 'animated'.
+    """
+    for effect in effects:
+        if not getattr(effect, 'enabled', True):
+            continue
+        for layer in getattr(effect, 'layers', []):
+            if layer.enabled and getattr(layer, 'audio_reactive', False):
+                return 'audio'
+    return 'animated' if frame_changed else 'static'
+
+def scene_is_animated(effects, global_settings):
+    """
+    False when the next frame is certain to match the last one: brightness
+    is off, or no enabled layer changes over time. Audio layers always count
+    as animated.
+    """
+    if global_settings.get('identify_device', -1) != -1:
+        return True # The identify flash blinks
+    if global_settings.get('brightness', 1.0) <= 0:
+        return False
+    for effect in effects:
+        if not getattr(effect, 'enabled', True):
+            continue
+        if not hasattr(effect, 'layers'):
+            return True # Unknown effect type, assume it moves
+        for layer in effect.layers:
+            if layer.enabled and layer.is_animated():
+                return True
+    return False
+
+class FrameRateGovernor:
+    """
+    Picks the render rate between fps_min and fps_max from what a frame
+    costs (render + push time) and what the scene is doing.
+
+    Audio and animated scenes aim for fps_max; a static scene drops to
+    fps_min. If a frame's cost eats more than the budget share of its
+    period, the rate is lowered to what the machine sustains. It recovers
+    gradually once there is headroom again.
+    """
+    BUDGET = 0.75 # Share of the frame period rendering may use
+    STATIC_FRAMES = 30 # Unchanged frames before a scene counts as static
+    SMOOTHING = 0.1
+
+    def __init__(self, fps_min=15, fps_max=60):
+        self.fps_min = fps_min
+        self.fps_max = fps_max
+        self.fps = float(fps_max)
+        self.render_s = 0.0
+        self.push_s = 0.0
+        self.unchanged = 0
+        self.activity = 'animated'
+        self.reason = "starting"
+        self.last_update = time.perf_counter()
+
+    def update(self, render_s, push_s, activity, fps_min=None, fps_max=None):
+        """
+        Feeds one frame's measurements and returns the rate for the next.
+        """
+        if fps_min is not None:
+            self.fps_min = fps_min
+        if fps_max is not None:
+            self.fps_max = fps_max
+        lo = max(1.0, float(min(self.fps_min, self.fps_max)))
+        hi = max(lo, float(self.fps_max))
+
+        self.render_s += self.SMOOTHING * (render_s - self.render_s)
+        self.push_s += self.SMOOTHING * (push_s - self.push_s)
+
+        # Require a run of unchanged frames so a momentary pause isn't "static"
+        if activity == 'static':
+            self.unchanged += 1
+            if self.unchanged < self.STATIC_FRAMES:
+                activity = 'animated'
+        else:
+            self.unchanged = 0
+        self.activity = activity
+
+        target = lo if activity == 'static' else hi
+        cost = self.render_s + self.push_s
+        sustainable = self.BUDGET / cost if cost > 0 else hi
+        was_limited = self.reason.startswith("limited")
+        if sustainable < target:
+            target = max(lo, sustainable)
+            self.reason = f"limited by frame cost ({cost * 1000:.1f} ms)"
+        elif activity == 'static':
+            self.reason = "scene is static"
+        elif activity == 'audio':
+            self.reason = "audio reactive"
+        else:
+            self.reason = "animated"
+
+        now = time.perf_counter()
+        dt = min(1.0, now - self.last_update)
+        self.last_update = now
+        if target < self.fps or not was_limited:
+            # Drop at once when falling behind or going static, and jump back
+            # as soon as a static scene starts moving
+            self.fps = target
+        else:
+            # After being cost limited, ramp back up gradually
+            self.fps = min(target, self.fps * (1.0 + dt))
+        return self.fps
+
+    def status(self):
+        return {
+            'fps': self.fps,
+            'activity': self.activity,
+            'render_ms': self.render_s * 1000.0,
+            'push_ms': self.push_s * 1000.0,
+            'reason': self.reason,
+        }
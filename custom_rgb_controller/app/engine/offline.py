@@ -0,0 +1,228 @@
+"""
+Renders a profile off-line on a virtual clock and writes the frames to
+disk, for golden-image regression checks and for measuring how fast the
+render path runs when nothing waits for real time or devices.
+
+Run from the custom_rgb_controller directory:
+    python -m app.engine.offline PROFILE --leds 300 --duration 10 --fps 60 -o out.frames
+    python -m app.engine.offline PROFILE --leds map.json --layout layout.json -o strip.png
+    python -m app.engine.offline PROFILE --leds 300 --compare golden.frames
+
+PROFILE is a profile JSON file or the name of a saved profile. Output
+formats by extension:
+    .frames  FRAME_HEADER followed by uint8 frames, shape (frames, leds, 3);
+             open_frames() maps it back into a numpy array
+    .ppm     binary PPM image strip, one row per frame
+    .png     PNG image strip, one row per frame
+Without -o the frames are only rendered, which measures peak throughput.
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+import numpy as np
+
+from app.core.led_map import LedMap
+from app.core.layout import LayoutManager
+from app.core.profiles import ProfileManager
+from app.creator.engine import CreatorEffect
+from app.creator.nodes import NODE_CLASSES
+from app.engine.renderer import render_frame
+
+# magic, version, led count, frame count, fps, start time
+FRAME_HEADER = struct.Struct('<8sIIIdd')
+FRAME_MAGIC = b'ARESFRM\0'
+FRAME_VERSION = 1
+
+def load_profile(profile):
+    # A path to a profile JSON, or the name of a profile in the profiles folder
+    if os.path.exists(profile):
+        with open(profile, 'r') as f:
+            return json.load(f)
+    data = ProfileManager().load_profile(profile)
+    if data is None:
+        raise ValueError(f"profile not found: {profile}")
+    return data
+
+def load_led_map(leds, layout_file=None):
+    """
+    leds is an LED count or a JSON file holding LedMap specs, e.g.
+    [["Strip", [["Strip", 60]]], ["Keyboard", [["Keys", 104, matrix_map]]]].
+    With a layout file the devices are placed like in the app.
+    """
+    if str(leds).isdigit():
+        led_map = LedMap.from_count(int(leds))
+    else:
+        with open(leds, 'r') as f:
+            led_map = LedMap(json.load(f))
+    if layout_file:
+        LayoutManager(layout_file).apply(led_map)
+    return led_map
+
+def load_effect(data):
+    effect = CreatorEffect()
+    effect.load_from_dict(data, NODE_CLASSES)
+    # Noise layers saved without a seed would get a random one on every run
+    loaded = [d for d in data.get('layers', []) if d.get('class') in NODE_CLASSES]
+    for index, (layer, layer_data) in enumerate(zip(effect.layers, loaded)):
+        if hasattr(layer, 'noise_seed') and 'noise_seed' not in layer_data:
+            print(f"Layer '{layer.name}' has no saved noise seed, using {index}")
+            layer.from_dict({**layer_data, 'noise_seed': index})
+    # Live audio can't be replayed; those layers would make the output random
+    for layer in effect.layers:
+        if layer.audio_reactive and layer.enabled:
+            print(f"Skipping audio layer '{layer.name}' (output would not be deterministic)")
+            layer.enabled = False
+    return effect
+
+def frame_times(start, duration, fps):
+    # Virtual clock: frame i is at start + i / fps, however long rendering takes
+    return start + np.arange(int(round(duration * fps))) / fps
+
+def render_frames(leds, effects, times, global_settings=None):
+    global_settings = global_settings or {'brightness': 1.0, 'identify_device': -1}
+    for t in times:
+        yield render_frame(leds, effects, global_settings, float(t))
+
+class FrameFileWriter:
+    """
+    Streams frames into a .frames file. The frame count in the header is
+    filled in on close, so a file cut short by a crash reads as empty.
+    """
+    def __init__(self, path, led_count, fps, start=0.0):
+        self.file = open(path, 'wb')
+        self.led_count = led_count
+        self.fps = fps
+        self.start = start
+        self.count = 0
+        self.file.write(self.header())
+
+    def header(self):
+        return FRAME_HEADER.pack(FRAME_MAGIC, FRAME_VERSION, self.led_count, self.count, self.fps, self.start)
+
+    def write(self, frame):
+        self.file.write(np.ascontiguousarray(frame, dtype=np.uint8).tobytes())
+        self.count += 1
+
+    def close(self):
+        self.file.seek(0)
+        self.file.write(self.header())
+        self.file.close()
+
+def open_frames(path):
+    """
+    Maps a .frames file without reading it. Returns (frames, fps, start)
+    with frames a read-only uint8 array of shape (frames, leds, 3).
+    """
+    with open(path, 'rb') as f:
+        header = f.read(FRAME_HEADER.size)
+    if len(header) < FRAME_HEADER.size:
+        raise ValueError(f"{path}: not a frames file")
+    magic, version, led_count, count, fps, start = FRAME_HEADER.unpack(header)
+    if magic != FRAME_MAGIC or version != FRAME_VERSION:
+        raise ValueError(f"{path}: not a frames file")
+    if count == 0:
+        return np.zeros((0, led_count, 3), dtype=np.uint8), fps, start
+    frames = np.memmap(path, dtype=np.uint8, mode='r', offset=FRAME_HEADER.size, shape=(count, led_count, 3))
+    return frames, fps, start
+
+class PpmStripWriter:
+    def __init__(self, path, led_count, frame_count):
+        self.file = open(path, 'wb')
+        self.file.write(f"P6\n{led_count} {frame_count}\n255\n".encode('ascii'))
+
+    def write(self, frame):
+        self.file.write(np.ascontiguousarray(frame, dtype=np.uint8).tobytes())
+
+    def close(self):
+        self.file.close()
+
+class PngStripWriter:
+    # 8-bit RGB, no interlacing; rows are compressed as they come in
+    def __init__(self, path, led_count, frame_count):
+        self.file = open(path, 'wb')
+        self.file.write(b'\x89PNG\r\n\x1a\n')
+        self.chunk(b'IHDR', struct.pack('>IIBBBBB', led_count, frame_count, 8, 2, 0, 0, 0))
+        self.compressor = zlib.compressobj()
+
+    def chunk(self, kind, data):
+        self.file.write(struct.pack('>I', len(data)) + kind + data)
+        self.file.write(struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+
+    def write(self, frame):
+        # Filter type 0 (none) before every row
+        data = self.compressor.compress(b'\0' + np.ascontiguousarray(frame, dtype=np.uint8).tobytes())
+        if data:
+            self.chunk(b'IDAT', data)
+
+    def close(self):
+        self.chunk(b'IDAT', self.compressor.flush())
+        self.chunk(b'IEND', b'')
+        self.file.close()
+
+def open_writer(path, led_count, frame_count, fps, start):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.ppm':
+        return PpmStripWriter(path, led_count, frame_count)
+    if ext == '.png':
+        return PngStripWriter(path, led_count, frame_count)
+    return FrameFileWriter(path, led_count, fps, start)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a profile off-line on a virtual clock.")
+    parser.add_argument('profile', help="profile JSON file or saved profile name")
+    parser.add_argument('--leds', default='100', help="LED count or LED map JSON file (default: 100)")
+    parser.add_argument('--layout', help="layout.json placing the devices of the LED map")
+    parser.add_argument('--start', type=float, default=0.0, help="virtual start time in seconds")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds to render (default: 10)")
+    parser.add_argument('--fps', type=float, default=60.0)
+    parser.add_argument('--brightness', type=float, default=1.0)
+    parser.add_argument('-o', '--output', help="output file: .frames, .ppm or .png")
+    parser.add_argument('--compare', help="golden .frames file; exits with 1 if any frame differs")
+    args = parser.parse_args(argv)
+
+    try:
+        leds = load_led_map(args.leds, args.layout)
+        effect = load_effect(load_profile(args.profile))
+    except (OSError, ValueError) as e:
+        print(e)
+        return 1
+    times = frame_times(args.start, args.duration, args.fps)
+    settings = {'brightness': args.brightness, 'identify_device': -1}
+
+    golden = None
+    if args.compare:
+        golden, _, _ = open_frames(args.compare)
+        if golden.shape != (len(times), len(leds), 3):
+            print(f"Golden file has shape {golden.shape}, rendering {(len(times), len(leds), 3)}")
+            return 1
+    writer = open_writer(args.output, len(leds), len(times), args.fps, args.start) if args.output else None
+
+    mismatches = 0
+    start = time.perf_counter()
+    try:
+        for i, frame in enumerate(render_frames(leds, [effect], times, settings)):
+            if writer is not None:
+                writer.write(frame)
+            if golden is not None and not np.array_equal(frame, golden[i]):
+                if mismatches == 0:
+                    diff = np.abs(frame.astype(np.int16) - golden[i]).max()
+                    print(f"Frame {i} (t={times[i]:.4f} s) differs from the golden file, max difference {diff}")
+                mismatches += 1
+    finally:
+        if writer is not None:
+            writer.close()
+    elapsed = time.perf_counter() - start
+
+    rate = len(times) / elapsed if elapsed > 0 else float('inf')
+    print(f"Rendered {len(times)} frames of {len(leds)} LEDs in {elapsed:.3f} s ({rate:.1f} frames/s)")
+    if golden is not None:
+        print(f"{mismatches} of {len(times)} frames differ" if mismatches else "All frames match the golden file")
+        return 1 if mismatches else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,204 @@
+import json
+import math
+import multiprocessing as mp
+import os
+import time
+from multiprocessing import shared_memory
+import numpy as np
+
+def plan_shards(leds, count):
+    """
+    Splits the LED range into roughly equal shards. Cuts snap to a device
+    boundary when one is close enough, otherwise large devices are split.
+    """
+    total = len(leds)
+    count = max(1, min(int(count), total))
+    if total == 0:
+        return []
+
+    boundaries = []
+    if hasattr(leds, 'devices'):
+        boundaries = sorted({d.offset for d in leds.devices if 0 < d.offset < total})
+
+    target = total / count
+    cuts = []
+    for k in range(1, count):
+        ideal = k * target
+        cut = int(round(ideal))
+        if boundaries:
+            nearest = min(boundaries, key=lambda b: abs(b - ideal))
+            if abs(nearest - ideal) <= target * 0.25:
+                cut = nearest
+        if (not cuts or cut > cuts[-1]) and 0 < cut < total:
+            cuts.append(cut)
+
+    edges = [0] + cuts + [total]
+    return [slice(a, b) for a, b in zip(edges[:-1], edges[1:])]
+
+def _render_worker(shm_name, total, shard, leds, conn):
+    # Imported here so the spawned process only pays for what it renders
+    from app.creator.engine import CreatorEffect
+    from app.creator.nodes import NODE_CLASSES
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    frame = np.ndarray((total, 3), dtype=np.uint8, buffer=shm.buf)
+    effects = {}
+
+    try:
+        # Start-up (spawn plus imports) is slow; tell the pool when we can render
+        conn.send('ready')
+        while True:
+            msg = conn.recv()
+            if msg is None:
+                break
+            effect_id, t, state, positions = msg
+            try:
+                if positions is not None:
+                    # The layout was edited in place in the main process
+                    leds.set_positions(*positions)
+                effect = effects.get(effect_id)
+                if effect is None:
+                    effect = effects[effect_id] = CreatorEffect()
+                if state is not None:
+                    effect.load_from_dict(state, NODE_CLASSES)
+                out = effect.render(leds, t, shard)
+                frame[shard] = out
+                conn.send(True)
+            except Exception as e:
+                print(f"Render worker error: {e}")
+                conn.send(False)
+    finally:
+        del frame
+        shm.close()
+
+class ParallelRenderer:
+    """
+    Renders a CreatorEffect across worker processes. Each worker owns a
+    shard of the LED map and writes straight into one shared-memory frame,
+    so assembling the result is free. The effect is sent to the workers as
+    its dict form whenever it changes, the LED coordinates whenever the
+    layout version moves.
+
+    Effects with audio-reactive layers are rendered in the main process
+    (see can_render): the layer reads one live capture across all LEDs.
+    render() returns None when a shard failed; after a worker died or
+    stopped answering, `broken` is set and the pool should be replaced.
+    """
+    REPLY_TIMEOUT_S = 2.0
+    STARTUP_TIMEOUT_S = 30.0
+
+    def __init__(self, leds, workers=None):
+        if workers is None:
+            workers = default_worker_count(len(leds))
+        self.leds = leds
+        self.total = len(leds)
+        self.shards = plan_shards(leds, workers)
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, self.total * 3))
+        self.frame = np.ndarray((self.total, 3), dtype=np.uint8, buffer=self.shm.buf)
+        self.frame[:] = 0
+
+        # Spawn on every platform, matching the Windows behavior
+        ctx = mp.get_context('spawn')
+        self.conns = []
+        self.procs = []
+        for shard in self.shards:
+            parent_conn, child_conn = ctx.Pipe()
+            proc = ctx.Process(
+                target=_render_worker,
+                args=(self.shm.name, self.total, shard, leds, child_conn),
+                daemon=True
+            )
+            proc.start()
+            child_conn.close()
+            self.conns.append(parent_conn)
+            self.procs.append(proc)
+
+        self._last_state = {}
+        self.layout_version = getattr(leds, 'layout_version', 0)
+        self.broken = False
+        self._wait_ready()
+
+    def _wait_ready(self):
+        # Frames only get REPLY_TIMEOUT_S, so wait out worker start-up here
+        deadline = time.perf_counter() + self.STARTUP_TIMEOUT_S
+        try:
+            for conn in self.conns:
+                if not conn.poll(max(0.0, deadline - time.perf_counter())):
+                    raise TimeoutError("render worker did not start")
+                if conn.recv() != 'ready':
+                    raise EOFError
+        except (OSError, EOFError):
+            print("Parallel render workers failed to start")
+            self.broken = True
+
+    @staticmethod
+    def can_render(effect):
+        if not hasattr(effect, 'to_dict'):
+            return False
+        return not any(layer.enabled and layer.audio_reactive for layer in getattr(effect, 'layers', []))
+
+    def render(self, effect, t):
+        """
+        Returns the shared frame as a (count, 3) uint8 array, overwritten by
+        the next call, or None if a shard could not be rendered.
+        """
+        if self.broken:
+            return None
+        state = effect.to_dict()
+        key = json.dumps(state, sort_keys=True)
+        changed = self._last_state.get(id(effect)) != key
+
+        positions = None
+        version = getattr(self.leds, 'layout_version', 0)
+        if version != self.layout_version:
+            positions = (self.leds.x.copy(), self.leds.y.copy())
+
+        msg = (id(effect), t, state if changed else None, positions)
+        ok = True
+        try:
+            for conn in self.conns:
+                conn.send(msg)
+            # Collect every reply, even after a failure, to keep the pipes in step
+            for conn in self.conns:
+                if not conn.poll(self.REPLY_TIMEOUT_S):
+                    raise TimeoutError("render worker did not answer")
+                ok = conn.recv() and ok
+        except (OSError, EOFError) as e:
+            print(f"Parallel renderer failed: {e}")
+            self.broken = True
+            return None
+        # Only remember what every worker has
+        self.layout_version = version
+        if changed:
+            self._last_state[id(effect)] = key
+        return self.frame if ok else None
+
+    def close(self):
+        for conn in self.conns:
+            try:
+                conn.send(None)
+            except (OSError, ValueError):
+                pass
+        for proc in self.procs:
+            proc.join(timeout=1.0)
+            if proc.is_alive():
+                proc.terminate()
+        for conn in self.conns:
+            conn.close()
+        self.conns = []
+        self.procs = []
+
+        del self.frame
+        self.shm.close()
+        self.shm.unlink()
+
+def should_render_parallel(led_count, global_settings):
+    if not global_settings.get('parallel_render', False):
+        return False
+    return led_count >= int(global_settings.get('parallel_threshold', 5000))
+
+def default_worker_count(led_count):
+    # One worker per ~2,500 LEDs, bounded by the available cores
+    cores = max(1, (os.cpu_count() or 2) - 1)
+    return max(1, min(cores, math.ceil(led_count / 2500)))
@@ -0,0 +1,35 @@
+import threading
+import numpy as np
+
+class FrameSlot:
+    """
+    Holds the latest frame the render thread sent to the LEDs, for previews
+    on the GUI thread. Readers poll latest() and skip repainting while the
+    version hasn't moved.
+
+    If width is set, frames longer than that are reduced to width LEDs
+    before they are stored, so a preview of a huge setup stays cheap.
+    """
+    def __init__(self, width=None):
+        self.width = width
+        self.version = 0
+        self.frame = None
+        self.lock = threading.Lock()
+
+    def publish(self, frame):
+        # The render thread hands over a frame it won't modify again
+        width = self.width
+        if width and len(frame) > width:
+            frame = downsample(frame, width)
+        with self.lock:
+            self.frame = frame
+            self.version += 1
+
+    def latest(self):
+        with self.lock:
+            return self.version, self.frame
+
+def downsample(frame, width):
+    # Brightest LED per bin, so single lit LEDs still show up
+    edges = np.linspace(0, len(frame), width + 1).astype(np.intp)
+    return np.maximum.reduceat(frame, edges[:-1], axis=0)
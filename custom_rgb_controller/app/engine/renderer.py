@@ -1,53 +1,268 @@
 import time
+import threading
+import numpy as np
+from app.engine.parallel import ParallelRenderer, should_render_parallel
+from app.engine.governor import FrameRateGovernor, scene_activity, scene_is_animated
+from app.engine.waker import render_waker
+from app.core.startup_timing import startup_timer
 
 def blend(a, b, alpha):
-    return (
-        int(a[0]*(1-alpha) + b[0]*alpha),
-        int(a[1]*(1-alpha) + b[1]*alpha),
-        int(a[2]*(1-alpha) + b[2]*alpha)
-    )
-
-def render_loop(leds, effects, backend, global_settings=None, fps=60):
-    if global_settings is None:
-        global_settings = {'brightness': 1.0, 'identify_device': -1, 'fps_limit': fps}
-
-    start = time.perf_counter()
-    while True:
-        # Dynamic FPS limit
-        current_fps = global_settings.get('fps_limit', fps)
-        if current_fps < 1: current_fps = 1
-        
-        frame_start = time.perf_counter()
-        t = frame_start - start
-        
-        # Base frame
-        frame = [(0,0,0)] * len(leds)
-
-        # Render effects
-        for effect in effects:
-            if not effect.enabled:
+    # a, b: (count, 3) uint8 frames
+    if alpha >= 1.0:
+        return b
+    if alpha <= 0.0:
+        return a
+    return (a * (1 - alpha) + b * alpha).astype(np.uint8)
+
+def to_frame(colors):
+    return np.asarray(colors, dtype=np.uint8).reshape(-1, 3)
+
+class Renderer:
+    """
+    Owns the render thread. start() launches it, stop() ends it within a
+    bounded time and flushes a final frame; pause()/resume() hold the
+    output without ending the thread.
+
+    Backend switches go through a BackendSwitch, and a new LED map is
+    taken from the backend between frames. Anything passed to call_soon()
+    also runs on the render thread between two frames, so a frame never
+    mixes old and new state.
+
+    stats, if given, is filled with the frame rate decision and frame cost
+    (see FrameRateGovernor.status) for the GUI to display.
+
+    With 'idle_mode' on, the loop parks on render_waker while the scene is
+    static and only wakes for a scene change (wake()) or a keep-alive resend.
+
+    preview, if given, is a FrameSlot that receives every changed frame
+    exactly as it was pushed to the backend.
+    """
+    MAX_PARALLEL_FAILURES = 3
+
+    def __init__(self, leds, effects, backend, global_settings=None, fps=60, stats=None, preview=None):
+        if global_settings is None:
+            global_settings = {'brightness': 1.0, 'identify_device': -1, 'fps_limit': fps}
+        self.leds = leds
+        self.effects = effects
+        self.backend = backend
+        self.global_settings = global_settings
+        self.fps = fps
+        self.stats = stats
+        self.preview = preview
+
+        self.paused = False
+        self.thread = None
+        self._stopping = threading.Event()
+        self._calls = []
+        self._calls_lock = threading.Lock()
+        self._parallel = None
+        self._parallel_failures = 0
+        self._last_frame = None
+
+    @property
+    def last_frame(self):
+        # The last frame that was pushed; replaced, never modified, on change
+        return self._last_frame
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stopping.clear()
+        self.thread = threading.Thread(target=self.run, name="render", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=2.0, final_frame=None):
+        """
+        Ends the render thread, waiting at most `timeout` seconds, then
+        pushes final_frame ('off' for all black, or an array) if given.
+        Returns False if the thread did not exit in time.
+        """
+        self._stopping.set()
+        render_waker.wake()
+        stopped = True
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+            stopped = not self.thread.is_alive()
+            if not stopped:
+                print(f"Render thread did not stop within {timeout} s")
+        if stopped:
+            self._close_parallel()
+
+        if final_frame is not None:
+            if isinstance(final_frame, str) and final_frame == 'off':
+                final_frame = np.zeros((len(self.leds), 3), dtype=np.uint8)
+            try:
+                self.backend.push_frame(final_frame)
+            except Exception as e:
+                print(f"Failed to send final frame: {e}")
+        return stopped
+
+    def pause(self):
+        # Devices keep showing the last frame
+        self.paused = True
+        render_waker.wake()
+
+    def resume(self):
+        self.paused = False
+        render_waker.wake()
+
+    def call_soon(self, fn, *args):
+        """
+        Runs fn(*args) on the render thread before the next frame.
+        """
+        with self._calls_lock:
+            self._calls.append((fn, args))
+        render_waker.wake()
+
+    def _run_calls(self):
+        with self._calls_lock:
+            calls, self._calls = self._calls, []
+        for fn, args in calls:
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"Render thread call failed: {e}")
+
+    def _close_parallel(self):
+        if self._parallel is not None:
+            self._parallel.close()
+            self._parallel = None
+
+    def run(self):
+        global_settings = self.global_settings
+        stats = self.stats
+        last_error = None
+        governor = FrameRateGovernor()
+        current_fps = global_settings.get('fps_limit', self.fps)
+        start = time.perf_counter()
+        while not self._stopping.is_set():
+            # Read before anything else so a change made mid-frame still wakes us
+            generation = render_waker.generation
+            self._run_calls()
+            if self.paused:
+                if stats is not None:
+                    stats.update({'fps': 0.0, 'reason': "paused", 'idle': True})
+                render_waker.wait(generation)
                 continue
-            ef = effect.render(leds, t)
-            frame = [blend(frame[i], ef[i], effect.opacity) for i in range(len(frame))]
-
-        # Apply Identify Override
-        # If identify_device is set to a device index, we flash that device white
-        identify_idx = global_settings.get('identify_device', -1)
-        if identify_idx != -1:
-            # Flash at 4Hz
-            flash = (int(t * 8) % 2) == 0
-            for i, led_data in enumerate(leds):
-                if isinstance(led_data, dict) and led_data['device_index'] == identify_idx:
-                    frame[i] = (255, 255, 255) if flash else (0, 0, 0)
-
-        # Apply global brightness
-        brightness = global_settings.get('brightness', 1.0)
-        if brightness != 1.0:
-            frame = [(int(r*brightness), int(g*brightness), int(b*brightness)) for r,g,b in frame]
-
-        backend.push_frame(frame)
-        
-        # Calculate sleep time to maintain target FPS
-        elapsed = time.perf_counter() - frame_start
-        sleep_time = max(0, (1.0 / current_fps) - elapsed)
-        time.sleep(sleep_time)
+
+            # Dynamic FPS limit, or the governor's pick when adaptive
+            fps_limit = max(1, global_settings.get('fps_limit', self.fps))
+            adaptive = global_settings.get('adaptive_fps', False)
+            if not adaptive:
+                current_fps = fps_limit
+            
+            frame_start = time.perf_counter()
+            t = frame_start - start
+            backend = self.backend
+            effects = self.effects
+
+            # Pick up a new LED map after the backend reconnects or devices change
+            backend_leds = getattr(backend, 'led_map', None)
+            if backend_leds is not None and backend_leds is not self.leds:
+                self.leds = backend_leds
+                self._close_parallel()
+                self._parallel_failures = 0
+            leds = self.leds
+
+            try:
+                # Optional process-pool rendering for very large installations
+                use_parallel = should_render_parallel(len(leds), global_settings)
+                if self._parallel is not None and self._parallel.broken:
+                    # A worker died: start a new pool, up to a few times
+                    self._parallel_failures += 1
+                    self._close_parallel()
+                    if self._parallel_failures == self.MAX_PARALLEL_FAILURES:
+                        print("Parallel rendering disabled after repeated worker failures")
+                use_parallel = use_parallel and self._parallel_failures < self.MAX_PARALLEL_FAILURES
+                if use_parallel and self._parallel is None:
+                    self._parallel = ParallelRenderer(leds)
+                elif not use_parallel:
+                    self._close_parallel()
+
+                frame = render_frame(leds, effects, global_settings, t, self._parallel)
+                render_done = time.perf_counter()
+                if self._parallel is not None and not self._parallel.broken:
+                    self._parallel_failures = 0
+                backend.push_frame(frame)
+                push_done = time.perf_counter()
+                last_error = None
+                if not startup_timer.has("first frame on devices"):
+                    startup_timer.mark("first frame")
+                    if getattr(backend, 'live', True) and getattr(backend, 'connected', True):
+                        startup_timer.mark("first frame on devices")
+
+                # Copy: with the parallel renderer the frame is a reused buffer
+                changed = self._last_frame is None or not np.array_equal(frame, self._last_frame)
+                if changed:
+                    self._last_frame = frame.copy()
+                    if self.preview is not None:
+                        self.preview.publish(self._last_frame)
+                governed = governor.update(render_done - frame_start, push_done - render_done,
+                                           scene_activity(effects, changed),
+                                           global_settings.get('fps_min', 15), fps_limit)
+                if adaptive:
+                    current_fps = governed
+                if stats is not None:
+                    stats.update(governor.status())
+                    stats['adaptive'] = adaptive
+                    stats['fps'] = current_fps
+            except Exception as e:
+                # Keep the thread alive; report each distinct error once
+                if str(e) != last_error:
+                    print(f"Render loop error: {e}")
+                    last_error = str(e)
+            
+            # Nothing can change until something wakes us: park the thread. Wake
+            # up for the keep-alive resend so devices don't revert meanwhile.
+            if global_settings.get('idle_mode', True) and not scene_is_animated(effects, global_settings):
+                if stats is not None:
+                    stats.update({'fps': 0.0, 'reason': "idle (static scene)", 'idle': True})
+                keepalive = float(global_settings.get('keepalive_interval', 1.0)) or 1.0
+                render_waker.wait(generation, keepalive)
+                continue
+            if stats is not None:
+                stats['idle'] = False
+            
+            # Calculate sleep time to maintain target FPS
+            elapsed = time.perf_counter() - frame_start
+            sleep_time = max(0, (1.0 / current_fps) - elapsed)
+            self._stopping.wait(sleep_time)
+
+def render_loop(leds, effects, backend, global_settings=None, fps=60, stats=None, preview=None):
+    # Blocking form: renders on the calling thread for the life of the process
+    Renderer(leds, effects, backend, global_settings, fps, stats, preview).run()
+
+def render_frame(leds, effects, global_settings, t, parallel=None):
+    # Base frame
+    frame = np.zeros((len(leds), 3), dtype=np.uint8)
+
+    # Render effects
+    for effect in effects:
+        if not effect.enabled:
+            continue
+        ef = None
+        if parallel is not None and parallel.can_render(effect):
+            ef = parallel.render(effect, t)
+        if ef is None:
+            ef = to_frame(effect.render(leds, t))
+        frame = blend(frame, ef, effect.opacity)
+
+    # Apply Identify Override
+    # If identify_device is set to a device index, we flash that device white
+    identify_idx = global_settings.get('identify_device', -1)
+    if identify_idx != -1:
+        # Flash at 4Hz
+        flash = (int(t * 8) % 2) == 0
+        if hasattr(leds, 'device_slice'):
+            frame[leds.device_slice(identify_idx)] = 255 if flash else 0
+
+    # Apply global brightness
+    brightness = global_settings.get('brightness', 1.0)
+    if brightness != 1.0:
+        frame = (frame * brightness).astype(np.uint8)
+
+    return frame
@@ -0,0 +1,30 @@
+import threading
+
+class RenderWaker:
+    """
+    Lets the render thread park while nothing on screen can change. Anything
+    that changes the scene (layer params, profile loads, settings, LED map)
+    calls wake(); the render loop waits for the generation to move on.
+    """
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.generation = 0
+
+    def wake(self):
+        with self.cond:
+            self.generation += 1
+            self.cond.notify_all()
+
+    def wait(self, generation, timeout=None):
+        """
+        Blocks until wake() was called after `generation` was read, or the
+        timeout passes. Returns True if woken.
+        """
+        with self.cond:
+            return self.cond.wait_for(lambda: self.generation != generation, timeout)
+
+# Shared by the render thread and everything that edits the scene
+render_waker = RenderWaker()
+
+def wake():
+    render_waker.wake()
@@ -3,7 +3,7 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QListWidget,
                              QSpinBox, QDoubleSpinBox, QGroupBox, QLineEdit, QColorDialog,
                              QFileDialog, QMessageBox, QInputDialog, QMenu, QGraphicsOpacityEffect)
 from PyQt6.QtGui import QAction
-from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QPropertyAnimation, QEasingCurve
+from PyQt6.QtCore import Qt, pyqtSignal, QPropertyAnimation, QEasingCurve
 from PyQt6.QtGui import QColor
 import json
 import time
@@ -11,22 +11,24 @@ import time
 from app.creator.engine import CreatorEffect
 from app.creator.nodes import NODE_TYPES, NODE_CLASSES, NODE_CATEGORIES
 from app.gui.visualizer import VisualizerWidget
+from app.gui.refresh import refresh
 from app.core.profiles import ProfileManager
 
 class CreatorWidget(QWidget):
     effect_updated = pyqtSignal() # Signal to notify main window to refresh
     profile_saved = pyqtSignal()
     
-    def __init__(self, creator_effect):
+    def __init__(self, creator_effect, leds=None, preview=None):
         super().__init__()
         self.creator_effect = creator_effect
+        self.leds = leds
+        self.preview = preview # FrameSlot fed by the render thread
+        self.preview_version = -1
         self.profile_manager = ProfileManager()
         self.init_ui()
         
-        # Setup Visualizer Timer
-        self.vis_timer = QTimer()
-        self.vis_timer.timeout.connect(self.update_visualizer)
-        self.vis_timer.start(33) # ~30fps
+        # Visualizer refresh, ~30fps while the page is on screen
+        self.vis_timer = refresh.schedule(self, 33, self.update_visualizer)
         
     def init_ui(self):
         layout = QHBoxLayout(self)
@@ -156,7 +158,16 @@ class CreatorWidget(QWidget):
         self.clear_properties()
         
     def update_visualizer(self):
-        # Render a preview frame locally
+        if self.preview is not None:
+            # Show what the LEDs show; one LED per pixel is all the preview can draw
+            self.preview.width = max(1, self.visualizer.width() - 40)
+            version, frame = self.preview.latest()
+            if frame is not None and version != self.preview_version:
+                self.preview_version = version
+                self.visualizer.update_data(frame)
+            return
+
+        # No render thread: render a preview frame locally
         # Use a dummy LED count of 50 for preview
         dummy_leds = [(0, 0, 0)] * 50
         # Create a context similar to the real engine
@@ -179,7 +190,7 @@ class CreatorWidget(QWidget):
         
         # Update the effect layers to only include valid ones
         if len(valid_layers) != len(self.creator_effect.layers):
-            self.creator_effect.layers = valid_layers
+            self.creator_effect.set_layers(valid_layers)
 
         if current >= 0 and current < self.layer_list.count():
             self.layer_list.setCurrentRow(current)
@@ -187,16 +198,14 @@ class CreatorWidget(QWidget):
     def move_layer_up(self):
         row = self.layer_list.currentRow()
         if row > 0:
-            self.creator_effect.layers[row], self.creator_effect.layers[row-1] = \
-                self.creator_effect.layers[row-1], self.creator_effect.layers[row]
+            self.creator_effect.move_layer(row, row - 1)
             self.refresh_layer_list()
             self.layer_list.setCurrentRow(row - 1)
             
     def move_layer_down(self):
         row = self.layer_list.currentRow()
         if row >= 0 and row < len(self.creator_effect.layers) - 1:
-            self.creator_effect.layers[row], self.creator_effect.layers[row+1] = \
-                self.creator_effect.layers[row+1], self.creator_effect.layers[row]
+            self.creator_effect.move_layer(row, row + 1)
             self.refresh_layer_list()
             self.layer_list.setCurrentRow(row + 1)
             
@@ -211,7 +220,7 @@ class CreatorWidget(QWidget):
     def remove_layer(self):
         row = self.layer_list.currentRow()
         if row >= 0:
-            self.creator_effect.layers.pop(row)
+            self.creator_effect.remove_layer(row)
             self.refresh_layer_list()
             self.clear_properties()
             
@@ -222,6 +231,11 @@ class CreatorWidget(QWidget):
             
         layer = self.creator_effect.layers[row]
         
+        # Target (which LEDs this layer renders to)
+        target_widget = self.create_target_widget(layer)
+        if target_widget:
+            self.prop_layout.addRow(QLabel("Target"), target_widget)
+        
         # Build dynamic UI based on params
         for key, value in layer.params.items():
             label = QLabel(key.title().replace("_", " "))
@@ -280,6 +294,45 @@ class CreatorWidget(QWidget):
         
         self.animate_properties_fade_in()
                 
+    def target_options(self):
+        # (label, target) pairs from the current LED map
+        options = [("All LEDs", None)]
+        if self.leds is None or not hasattr(self.leds, 'devices'):
+            return options
+        for device in self.leds.devices:
+            if device.count == 0:
+                continue
+            options.append((device.name, {'device': device.name}))
+            if len(device.zones) > 1:
+                for zone in device.zones:
+                    options.append((f"{device.name} / {zone.name}", {'device': device.name, 'zone': zone.name}))
+        return options
+        
+    def create_target_widget(self, layer):
+        options = self.target_options()
+        if layer.target and layer.target not in [t for _, t in options]:
+            # Keep targets that don't match the current LED map selectable
+            options.append((self.describe_target(layer.target), layer.target))
+        if len(options) == 1:
+            return None
+        
+        widget = QComboBox()
+        for label, target in options:
+            widget.addItem(label, target)
+        widget.setCurrentIndex([t for _, t in options].index(layer.target or None))
+        widget.currentIndexChanged.connect(lambda i, l=layer, w=widget: self.update_target(l, w.itemData(i)))
+        return widget
+        
+    def describe_target(self, target):
+        if 'start' in target:
+            return f"LEDs {target['start']}-{target.get('end', '')}"
+        if target.get('zone'):
+            return f"{target.get('device')} / {target['zone']}"
+        return str(target.get('device'))
+        
+    def update_target(self, layer, target):
+        layer.set_target(target)
+        
     def clear_properties(self):
         while self.prop_layout.count():
             item = self.prop_layout.takeAt(0)
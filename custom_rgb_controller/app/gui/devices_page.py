@@ -1,12 +1,20 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                             QPushButton, QScrollArea, QFrame, QGridLayout)
+                             QPushButton, QScrollArea, QFrame, QGridLayout,
+                             QDoubleSpinBox, QSpinBox)
 from PyQt6.QtCore import Qt, QTimer
+from app.core.layout import LayoutManager
+from app.engine.waker import wake
+from app.gui.refresh import refresh
 
 class DeviceCard(QFrame):
-    def __init__(self, index, name, led_count, identify_callback):
+    def __init__(self, index, name, led_count, identify_callback, placement=None, placement_callback=None,
+                 rate_limit=None, rate_callback=None):
         super().__init__()
         self.index = index
+        self.name = name
         self.identify_callback = identify_callback
+        self.placement_callback = placement_callback
+        self.rate_callback = rate_callback
         self.setObjectName("DeviceCard")
         self.update_theme("Dark") # Default to Dark
         
@@ -18,12 +26,42 @@ class DeviceCard(QFrame):
         self.count_lbl = QLabel(f"{led_count} LEDs")
         self.count_lbl.setObjectName("DeviceCount")
         
+        self.fps_lbl = QLabel("")
+        self.fps_lbl.setObjectName("DeviceCount")
+        
         info_layout.addWidget(self.name_lbl)
         info_layout.addWidget(self.count_lbl)
+        info_layout.addWidget(self.fps_lbl)
         
         layout.addLayout(info_layout)
         layout.addStretch()
         
+        # Physical placement (x, y, rotation) used by spatial effects
+        self.pos_inputs = []
+        if placement is not None:
+            for label, key, lo, hi in (("X", 'x', -9999.0, 9999.0), ("Y", 'y', -9999.0, 9999.0), ("Rot", 'rotation', -360.0, 360.0)):
+                spin = QDoubleSpinBox()
+                spin.setRange(lo, hi)
+                spin.setDecimals(1)
+                spin.setValue(placement.get(key, 0.0))
+                spin.setPrefix(f"{label} ")
+                spin.setToolTip("Device position in the spatial layout")
+                spin.valueChanged.connect(self.on_placement_changed)
+                layout.addWidget(spin)
+                self.pos_inputs.append(spin)
+        
+        # Per-device update cap, 0 = as fast as the render loop
+        if rate_callback is not None:
+            self.rate_spin = QSpinBox()
+            self.rate_spin.setRange(0, 240)
+            self.rate_spin.setValue(int(rate_limit or 0))
+            self.rate_spin.setPrefix("Max ")
+            self.rate_spin.setSuffix(" FPS")
+            self.rate_spin.setSpecialValueText("No FPS Limit")
+            self.rate_spin.setToolTip("Limit how often this device is updated (slow controllers)")
+            self.rate_spin.valueChanged.connect(lambda v: self.rate_callback(self.name, v))
+            layout.addWidget(self.rate_spin)
+        
         self.id_btn = QPushButton("Identify")
         self.id_btn.setCheckable(True)
         self.id_btn.clicked.connect(self.on_identify)
@@ -65,17 +103,38 @@ class DeviceCard(QFrame):
             self.id_btn.setText("Identify")
             self.identify_callback(-1)
             
+    def on_placement_changed(self, _value):
+        if self.placement_callback:
+            x, y, rotation = (spin.value() for spin in self.pos_inputs)
+            self.placement_callback(self.index, self.name, x, y, rotation)
+            
+    def set_stats(self, fps, dropped, duplicate_ratio=0.0):
+        self.fps_lbl.setText(f"{fps:.0f} FPS ({dropped} skipped, {duplicate_ratio:.0%} unchanged)")
+
     def reset(self):
         self.id_btn.setChecked(False)
         self.id_btn.setText("Identify")
 
 class DevicesPage(QWidget):
-    def __init__(self, backend, global_settings):
+    def __init__(self, backend, global_settings, leds=None, save_callback=None, renderer=None):
         super().__init__()
         self.backend = backend
         self.global_settings = global_settings
+        self.leds = leds
+        self.save_callback = save_callback
+        self.renderer = renderer
+        self.layout_manager = LayoutManager()
         self.cards = []
+
+        # Placement edits apply live but are written to layout.json once they settle
+        self.layout_save_timer = QTimer(self)
+        self.layout_save_timer.setSingleShot(True)
+        self.layout_save_timer.setInterval(500)
+        self.layout_save_timer.timeout.connect(self.layout_manager.save)
         self.init_ui()
+
+        # Achieved per-device update rates
+        self.stats_timer = refresh.schedule(self, 1000, self.update_stats)
         
     def init_ui(self):
         layout = QVBoxLayout(self)
@@ -84,7 +143,21 @@ class DevicesPage(QWidget):
         self.title = QLabel("Connected Devices")
         self.title.setObjectName("PageTitle")
         # Style will be set by update_theme or global stylesheet
-        layout.addWidget(self.title)
+        header = QHBoxLayout()
+        header.addWidget(self.title)
+        header.addStretch()
+        
+        # Re-reads the device list from the server (e.g. after replugging)
+        self.refresh_btn = QPushButton("Refresh")
+        self.refresh_btn.clicked.connect(self.on_refresh_clicked)
+        header.addWidget(self.refresh_btn)
+        layout.addLayout(header)
+        
+        # One line per OpenRGB server when several are combined
+        self.servers_lbl = QLabel("")
+        self.servers_lbl.setStyleSheet("color: #888;")
+        self.servers_lbl.hide()
+        layout.addWidget(self.servers_lbl)
         
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
@@ -118,7 +191,13 @@ class DevicesPage(QWidget):
             self.grid.itemAt(i).widget().setParent(None)
         self.cards = []
             
-        if not self.backend or not hasattr(self.backend, 'client'):
+        if self.leds is not None and hasattr(self.leds, 'devices') and hasattr(self.backend, 'led_map'):
+            # The LED map knows every device, including those of other servers
+            for device in self.leds.devices:
+                self.add_device_card(device.index, device.name, device.count)
+            return
+
+        if not self.backend or not hasattr(self.backend, 'registry'):
             # Mock devices if no backend
             mock_devices = [
                 ("Mock Keyboard", 104),
@@ -130,15 +209,31 @@ class DevicesPage(QWidget):
             return
 
         try:
-            for i, device in enumerate(self.backend.client.devices):
-                self.add_device_card(i, device.name, len(device.leds))
+            for info in self.backend.registry:
+                self.add_device_card(info.index, info.name, info.led_count)
         except Exception as e:
             lbl = QLabel(f"Error loading devices: {e}")
             lbl.setStyleSheet("color: red;")
             self.grid.addWidget(lbl)
             
     def add_device_card(self, index, name, count):
-        card = DeviceCard(index, name, count, self.handle_identify)
+        placement = None
+        if self.leds is not None and hasattr(self.leds, 'devices'):
+            placement = self.layout_manager.get_placement(name, index)
+            if placement is None:
+                # Start from where the default layout put the device
+                s = self.leds.device_slice(index)
+                placement = {'x': 0.0, 'y': 0.0, 'rotation': 0.0}
+                if s.stop > s.start:
+                    placement['x'] = float(self.leds.x[s].min())
+                    placement['y'] = float(self.leds.y[s].min())
+        rate_limit = None
+        rate_callback = None
+        if hasattr(self.backend, 'device_stats'):
+            rate_limit = self.global_settings.get('device_rate_limits', {}).get(name)
+            rate_callback = self.handle_rate_limit
+        card = DeviceCard(index, name, count, self.handle_identify, placement, self.handle_placement,
+                          rate_limit, rate_callback)
         self.grid.addWidget(card)
         self.cards.append(card)
         
@@ -150,3 +245,56 @@ class DevicesPage(QWidget):
                     card.reset()
         
         self.global_settings['identify_device'] = index
+        wake()
+
+    def handle_placement(self, index, name, x, y, rotation):
+        placement = self.layout_manager.get_placement(name, index) or {}
+        self.layout_manager.set_placement(name, index, x, y, rotation, placement.get('scale', 1.0))
+        self.layout_save_timer.start()
+        if self.leds is not None and hasattr(self.leds, 'devices'):
+            # The render thread reads the coordinates; change them between two frames
+            if self.renderer is not None:
+                self.renderer.call_soon(self.layout_manager.apply, self.leds)
+            else:
+                self.layout_manager.apply(self.leds)
+                wake()
+
+    def flush_layout(self):
+        # Writes a placement change still waiting for the save timer
+        if self.layout_save_timer.isActive():
+            self.layout_save_timer.stop()
+            self.layout_manager.save()
+
+    def on_refresh_clicked(self):
+        # The new map arrives through the main window's map check
+        if hasattr(self.backend, 'refresh_devices'):
+            self.backend.refresh_devices()
+
+    def handle_rate_limit(self, name, fps):
+        # Shared with the backend, which reads it on every send
+        limits = self.global_settings.setdefault('device_rate_limits', {})
+        if fps > 0:
+            limits[name] = fps
+        else:
+            limits.pop(name, None)
+        if self.save_callback:
+            self.save_callback()
+
+    def update_stats(self):
+        if hasattr(self.backend, 'server_stats'):
+            lines = []
+            for s in self.backend.server_stats():
+                state = "connected" if s['connected'] else "offline"
+                lines.append(f"{s['host']}:{s['port']}  {state}, {s['leds']} LEDs, "
+                             f"{s['latency_ms']:.1f} ms, {s['bytes_per_s'] / 1024:.0f} KB/s, {s['errors']} errors")
+            self.servers_lbl.setText("\n".join(lines))
+            self.servers_lbl.show()
+        else:
+            self.servers_lbl.hide()
+        if not hasattr(self.backend, 'device_stats'):
+            return
+        stats = {s['index']: s for s in self.backend.device_stats()}
+        for card in self.cards:
+            s = stats.get(card.index)
+            if s:
+                card.set_stats(s['fps'], s['dropped'], s.get('duplicate_ratio', 0.0))
@@ -1,42 +1,34 @@
 import sys
-import threading
-import json
 import os
-import time
 import ctypes
 if sys.platform == 'win32':
     import winreg
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                             QHBoxLayout, QPushButton, QLabel, QStackedWidget,
-                             QFrame, QSlider, QListWidget, QGroupBox, QMessageBox,
+                             QHBoxLayout, QLabel, QFrame, QMessageBox,
                              QGraphicsDropShadowEffect, QSystemTrayIcon, QMenu)
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QKeyEvent, QColor, QAction, QCloseEvent, QIcon
-import qtawesome as qta
+from PyQt6.QtCore import Qt, QTimer, QUrl, QEvent, pyqtSignal
+from PyQt6.QtGui import QColor, QAction, QCloseEvent, QIcon, QDesktopServices
 
-try:
-    from app.backend.openrgb_backend import OpenRGBBackend
-except ImportError:
-    OpenRGBBackend = None
+from app.backend.startup import BackendStarter, BackendSwitch, NullBackend
+from app.backend.first_light import LastFrameSaver
 
 from app.creator.engine import CreatorEffect
-from app.gui.creator_widget import CreatorWidget
 from app.gui.title_bar import CustomTitleBar
 from app.gui.sidebar import Sidebar
 from app.gui.styles import ARTEMIS_STYLESHEET, get_stylesheet
-from app.engine.renderer import render_loop
-from app.gui.devices_page import DevicesPage
-from app.gui.profiles_page import ProfilesPage
-from app.gui.settings_page import SettingsPage
+from app.engine.renderer import Renderer
+from app.engine.preview import FrameSlot
 from app.gui.animated_stacked_widget import AnimatedStackedWidget
-from app.path_utils import get_app_root
+from app.gui.refresh import refresh
 from app.core.profiles import ProfileManager
-
-class NullBackend:
-    def push_frame(self, frame):
-        return
+from app.core.led_map import LedMap
+from app.core.startup_timing import startup_timer
+from app.core.settings import load_settings, save_settings, settings_path
 
 class MainWindow(QMainWindow):
+    backend_status = pyqtSignal(str) # Emitted from the backend starter thread
+    control_changed = pyqtSignal(str) # Emitted from the render thread after a control API change
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("ARES")
@@ -65,15 +57,38 @@ class MainWindow(QMainWindow):
         self.effects = [self.creator_effect]
         
         # Start rendering thread
-        self.render_thread = threading.Thread(
-            target=render_loop, 
-            args=(self.leds, self.effects, self.backend, self.global_settings), 
-            daemon=True
-        )
-        self.render_thread.start()
+        self.render_stats = {} # Frame rate decision, filled by the render loop
+        self.preview = FrameSlot() # Latest frame sent to the LEDs, for the Creator preview
+        self.renderer = Renderer(self.leds, self.effects, self.backend, self.global_settings,
+                                 stats=self.render_stats, preview=self.preview)
+        self.renderer.start()
         
         self.init_ui()
+
+        # Follow LED map changes after the backend reconnects
+        self.map_version = getattr(self.backend, 'map_version', 0)
+        self.map_timer = QTimer(self)
+        self.map_timer.timeout.connect(self.check_led_map)
+        self.map_timer.timeout.connect(self.check_startup_report)
+        self.startup_reported = False
+        self.map_timer.start(1000)
+
+        # Keep the last output on disk for the next start (see first_light)
+        self.frame_saver = LastFrameSaver()
+        self.frame_save_timer = QTimer(self)
+        self.frame_save_timer.timeout.connect(self.save_last_frame)
+        self.frame_save_timer.start(10000)
+
+        # Connect to OpenRGB in the background; the window is usable meanwhile
+        self.backend_status.connect(self.on_backend_status)
+        if self.global_settings.get('auto_connect', True):
+            self.start_backend()
         self.init_tray()
+
+        # Let local scripts drive the engine (see app/service)
+        self.control = None
+        if self.global_settings.get('control_api', False):
+            self.start_control_api()
         
         # Apply initial theme
         self.on_theme_changed(self.global_settings.get('theme', 'Dark'))
@@ -137,68 +152,39 @@ class MainWindow(QMainWindow):
             print(f"Registry error: {e}")
 
     def load_settings(self):
-        self.settings_file = os.path.join(get_app_root(), 'settings.json')
-        default_settings = {
-            'brightness': 1.0, 
-            'identify_device': -1,
-            'fps_limit': 60,
-            'minimize_to_tray': True,
-            'start_minimized': False,
-            'auto_connect': True,
-            'openrgb_host': '127.0.0.1',
-            'openrgb_port': 6742,
-            'theme': 'Dark'
-        }
-        
-        if os.path.exists(self.settings_file):
-            try:
-                with open(self.settings_file, 'r') as f:
-                    loaded = json.load(f)
-                    # Merge with defaults
-                    self.global_settings = {**default_settings, **loaded}
-            except Exception:
-                self.global_settings = default_settings
-        else:
-            self.global_settings = default_settings
+        self.settings_file = settings_path()
+        self.global_settings = load_settings(self.settings_file)
 
         # Sync start_on_boot with actual registry state
         self.global_settings['start_on_boot'] = self.check_startup_registry()
 
     def save_settings(self):
-        try:
-            with open(self.settings_file, 'w') as f:
-                json.dump(self.global_settings, f, indent=4)
-        except Exception:
-            pass
+        save_settings(self.global_settings, self.settings_file)
 
     def init_backend(self):
-        if not OpenRGBBackend or not self.global_settings.get('auto_connect', True):
-            self.leds = list(range(100))
-            self.backend = NullBackend()
-            return
+        # Render to a NullBackend until the starter thread swaps in OpenRGB
+        self.leds = LedMap.from_count(100)
+        self.backend = BackendSwitch(NullBackend())
+        self.backend_starter = None
+        self.openrgb_process = None
+        self.conn_status = ""
 
-        host = str(self.global_settings.get('openrgb_host', '127.0.0.1'))
-        port = int(self.global_settings.get('openrgb_port', 6742))
-        connect_host = host
-        if connect_host in ("0.0.0.0", "::"):
-            connect_host = "127.0.0.1"
-
-        self.openrgb_process = OpenRGBBackend.ensure_server_running(host, port, wait_s=2.0)
-        
-        try:
-            self.backend = OpenRGBBackend(host=connect_host, port=port)
-            if hasattr(self.backend, 'get_led_map'):
-                self.leds = self.backend.get_led_map()
-            else:
-                total_leds = sum(len(d.leds) for d in self.backend.client.devices)
-                self.leds = list(range(total_leds))
+    def start_backend(self):
+        # Also run by the Settings page's Connect button while no backend is live
+        if self.backend_starter is not None and self.backend_starter.is_alive():
             return
-        except Exception:
-            # Connection failed
-            pass
+        self.backend_starter = BackendStarter(self.global_settings, self.backend.set_target, self.backend_status.emit)
+        self.backend_starter.start()
+
+    def on_backend_status(self, status):
+        if status in ('not_installed', 'failed'):
+            # No device frame is coming; report what we have
+            self.check_startup_report(force=True)
 
-        # If we reached here, connection failed. Check if installed.
-        if not OpenRGBBackend.is_installed():
+        if status == 'ready':
+            self.openrgb_process = self.backend_starter.openrgb_process
+            self.check_led_map()
+        elif status == 'not_installed':
             # Prompt user
             reply = QMessageBox.question(None, "OpenRGB Not Found", 
                                          "OpenRGB was not found on your system.\n"
@@ -208,10 +194,17 @@ class MainWindow(QMainWindow):
             
             if reply == QMessageBox.StandardButton.Yes:
                 QDesktopServices.openUrl(QUrl("https://openrgb.org/"))
-        
-        # Fallback to NullBackend
-        self.leds = list(range(100))
-        self.backend = NullBackend()
+
+        labels = {'connecting': "Connecting to OpenRGB...", 'not_installed': "OpenRGB is not installed.",
+                  'failed': "Could not connect to OpenRGB."}
+        if status in labels:
+            self.set_conn_status(labels[status])
+
+    def set_conn_status(self, text):
+        # Kept for the Settings page, which may not be built yet
+        self.conn_status = text
+        if self.settings_page is not None:
+            self.settings_page.conn_status_lbl.setText(text)
 
     def init_ui(self):
         # Main Window Layout (Transparent wrapper)
@@ -274,46 +267,107 @@ class MainWindow(QMainWindow):
         lbl.setStyleSheet("font-size: 18pt; color: #666;")
         home_layout.addWidget(lbl)
         self.stack.addWidget(home_page) # 0
-        
+
+        # The other pages are built on first visit; empty widgets hold their slots
+        self.creator_page = None
+        self.profiles_page = None
+        self.devices_page = None
+        self.settings_page = None
+        self.page_builders = {
+            1: self.build_creator_page,
+            2: self.build_profiles_page,
+            3: self.build_devices_page,
+            4: self.build_settings_page,
+        }
+        for _ in self.page_builders:
+            self.stack.addWidget(QWidget())
+
+    def ensure_page(self, index):
+        builder = self.page_builders.pop(index, None)
+        if builder is None:
+            return
+        page = builder()
+        placeholder = self.stack.widget(index)
+        self.stack.insertWidget(index, page)
+        self.stack.removeWidget(placeholder)
+        placeholder.deleteLater()
+        if hasattr(page, 'update_theme'):
+            page.update_theme(self.global_settings.get('theme', 'Dark'))
+        # Shows up in the startup report when built before it is printed
+        startup_timer.mark(f"{type(page).__name__} built")
+
+    def build_creator_page(self):
         # Workshop - Creator
-        self.creator_page = CreatorWidget(self.creator_effect)
+        from app.gui.creator_widget import CreatorWidget
+        self.creator_page = CreatorWidget(self.creator_effect, self.leds, self.preview)
         self.creator_page.profile_saved.connect(self.on_profile_saved)
-        self.stack.addWidget(self.creator_page) # 1
-        
-        # Profiles Page
+        return self.creator_page
+
+    def build_profiles_page(self):
+        from app.gui.profiles_page import ProfilesPage
         self.profiles_page = ProfilesPage(self.global_settings, self.save_settings)
         self.profiles_page.profile_loaded.connect(self.on_profile_loaded)
-        self.stack.addWidget(self.profiles_page) # 2
-        
-        # Devices Page
-        self.devices_page = DevicesPage(self.backend, self.global_settings)
-        self.stack.addWidget(self.devices_page) # 3
-        
-        # Settings Page
-        self.settings_page = SettingsPage(self.backend, self.global_settings, self.save_settings, self.set_startup_registry)
+        return self.profiles_page
+
+    def build_devices_page(self):
+        from app.gui.devices_page import DevicesPage
+        self.devices_page = DevicesPage(self.backend, self.global_settings, self.leds, self.save_settings,
+                                        self.renderer)
+        return self.devices_page
+
+    def build_settings_page(self):
+        from app.gui.settings_page import SettingsPage
+        self.settings_page = SettingsPage(self.backend, self.global_settings, self.save_settings, self.set_startup_registry,
+                                          self.render_stats, self.start_backend)
         self.settings_page.theme_changed.connect(self.on_theme_changed)
-        self.stack.addWidget(self.settings_page) # 4
+        if self.conn_status:
+            self.settings_page.conn_status_lbl.setText(self.conn_status)
+        return self.settings_page
         
+    def check_led_map(self):
+        version = getattr(self.backend, 'map_version', 0)
+        if version == self.map_version or self.backend.led_map is None:
+            return
+        self.map_version = version
+        self.leds = self.backend.led_map
+
+        # The render thread adopts the new map on its own; refresh the pages
+        if self.creator_page is not None:
+            self.creator_page.leds = self.leds
+        if self.devices_page is not None:
+            self.devices_page.leds = self.leds
+            self.devices_page.populate_devices()
+            self.devices_page.update_theme(self.global_settings.get('theme', 'Dark'))
+        self.set_conn_status(f"Connected ({len(self.leds)} LEDs)")
+
+    def check_startup_report(self, force=False):
+        if self.startup_reported or not (force or startup_timer.has("first frame on devices")):
+            return
+        self.startup_reported = True
+        print(startup_timer.report())
+
     def on_theme_changed(self, theme_name):
         new_stylesheet = get_stylesheet(theme_name)
         self.setStyleSheet(new_stylesheet)
         self.sidebar.update_theme(theme_name)
-        if hasattr(self, 'devices_page'):
+        if self.devices_page is not None:
             self.devices_page.update_theme(theme_name)
-        if hasattr(self, 'creator_page'):
+        if self.creator_page is not None:
             self.creator_page.update_theme(theme_name)
         
     def on_profile_loaded(self, data):
+        self.ensure_page(1)
         self.creator_page.load_data(data)
         self.switch_page(1) # Switch to Creator tab to show loaded effect
         self.sidebar.set_active_index(1)
 
     def on_profile_saved(self):
         # Refresh the profiles page list if it exists
-        if hasattr(self, 'profiles_page'):
+        if self.profiles_page is not None:
             self.profiles_page.refresh_list()
 
     def switch_page(self, index):
+        self.ensure_page(index)
         self.stack.slideInIdx(index)
 
     def init_tray(self):
@@ -324,6 +378,7 @@ class MainWindow(QMainWindow):
         if os.path.exists(icon_path):
             icon = QIcon(icon_path)
         else:
+            import qtawesome as qta
             icon = qta.icon('fa5s.lightbulb', color='#007acc')
             
         self.tray_icon.setIcon(icon)
@@ -343,6 +398,14 @@ class MainWindow(QMainWindow):
         
         tray_menu.addSeparator()
         
+        # Pause Action: devices hold the last frame until resumed
+        pause_action = QAction("Pause Lighting", self)
+        pause_action.setCheckable(True)
+        pause_action.toggled.connect(lambda paused: self.renderer.pause() if paused else self.renderer.resume())
+        tray_menu.addAction(pause_action)
+        
+        tray_menu.addSeparator()
+        
         # Quit Action
         quit_action = QAction("Quit", self)
         quit_action.triggered.connect(self.quit_app)
@@ -362,11 +425,55 @@ class MainWindow(QMainWindow):
                 self.show()
                 self.activateWindow()
 
+    def start_control_api(self):
+        from app.service.control import ControlServer
+        from app.service.commands import ControlCommands
+        commands = ControlCommands(self.renderer, self.creator_effect, self.global_settings, ProfileManager(),
+                                   self.backend, self.render_stats, self.global_settings.get('favorite_profile'),
+                                   on_change=self.control_changed.emit)
+        try:
+            self.control = ControlServer(commands.table(), port=int(self.global_settings.get('control_port', 6750)))
+        except OSError as e:
+            print(f"Control API unavailable: {e}")
+            return
+        self.control_changed.connect(self.on_control_changed)
+        self.control.start()
+
+    def on_control_changed(self, what):
+        # Show changes made by scripts if the Creator page is built
+        if self.creator_page is None:
+            return
+        if what == 'profile':
+            self.creator_page.refresh_layer_list()
+            self.creator_page.clear_properties()
+        elif what == 'param':
+            self.creator_page.on_layer_selected(self.creator_page.layer_list.currentRow())
+
+    def save_last_frame(self):
+        if self.global_settings.get('restore_last_frame', True):
+            self.frame_saver.save(self.renderer.last_frame, self.backend)
+
     def quit_app(self):
-        # Clean up threads if needed
+        if self.control is not None:
+            self.control.close()
+        if self.devices_page is not None:
+            self.devices_page.flush_layout()
+        self.save_last_frame()
+        # Stop rendering before the backend goes away, then blank the LEDs
+        final_frame = 'off' if self.global_settings.get('leds_off_on_exit', False) else None
+        self.renderer.stop(timeout=2.0, final_frame=final_frame)
+        close = getattr(self.backend, 'close', None)
+        if close:
+            close()
         self.tray_icon.hide()
         QApplication.quit()
 
+    def changeEvent(self, event):
+        # Minimizing doesn't hide the pages, so pause their refresh here
+        if event.type() == QEvent.Type.WindowStateChange:
+            refresh.set_suspended(self.isMinimized())
+        super().changeEvent(event)
+
     def closeEvent(self, event: QCloseEvent):
         if self.global_settings.get('minimize_to_tray', True):
             event.ignore()
@@ -395,6 +502,7 @@ def run_app():
         app.setWindowIcon(QIcon(icon_path))
 
     window = MainWindow()
+    startup_timer.mark("window built")
     
     # Check start minimized setting
     if window.global_settings.get('start_minimized', False):
@@ -402,5 +510,7 @@ def run_app():
         pass
     else:
         window.show()
+        # Runs once the event loop has handled the first expose and paint
+        QTimer.singleShot(0, lambda: startup_timer.mark("first paint"))
         
     sys.exit(app.exec())
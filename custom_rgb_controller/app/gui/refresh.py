@@ -0,0 +1,57 @@
+from PyQt6.QtCore import QObject, QEvent, QTimer
+
+class RefreshScheduler(QObject):
+    """
+    Runs periodic GUI refresh work only while someone can see it. Each
+    timer belongs to a widget and only ticks while that widget is shown:
+    page switches, hiding to the tray and minimizing all stop it. Widgets
+    get Show/Hide events when their page or window changes, so nothing
+    has to poll.
+    """
+    def __init__(self):
+        super().__init__()
+        self.entries = {} # widget -> [(timer, interval, callback), ...]
+        self.shown = {}
+        self.suspended = False
+
+    def schedule(self, widget, interval_ms, callback):
+        # The timer is owned by the widget and goes away with it
+        timer = QTimer(widget)
+        timer.timeout.connect(callback)
+        if widget not in self.entries:
+            self.entries[widget] = []
+            self.shown[widget] = widget.isVisible()
+            widget.installEventFilter(self)
+            widget.destroyed.connect(lambda _=None, w=widget: self.forget(w))
+        self.entries[widget].append((timer, interval_ms, callback))
+        self.sync(widget)
+        return timer
+
+    def forget(self, widget):
+        self.entries.pop(widget, None)
+        self.shown.pop(widget, None)
+
+    def set_suspended(self, suspended):
+        # Window minimized: everything stops regardless of page visibility
+        self.suspended = suspended
+        for widget in list(self.entries):
+            self.sync(widget)
+
+    def sync(self, widget):
+        active = self.shown.get(widget, False) and not self.suspended
+        for timer, interval, callback in self.entries.get(widget, []):
+            if active and not timer.isActive():
+                timer.start(interval)
+                # Catch up at once instead of showing stale data for a tick
+                QTimer.singleShot(0, callback)
+            elif not active and timer.isActive():
+                timer.stop()
+
+    def eventFilter(self, obj, event):
+        if obj in self.entries and event.type() in (QEvent.Type.Show, QEvent.Type.Hide):
+            self.shown[obj] = event.type() == QEvent.Type.Show
+            self.sync(obj)
+        return False
+
+# Shared by every page; MainWindow suspends it while minimized
+refresh = RefreshScheduler()
@@ -1,20 +1,27 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QLineEdit, QSpinBox, QPushButton, QCheckBox, 
                              QComboBox, QGroupBox, QFormLayout, QTabWidget,
-                             QSlider, QScrollArea)
+                             QSlider, QScrollArea, QDoubleSpinBox)
 from PyQt6.QtCore import Qt, pyqtSignal
+from app.engine.waker import wake
+from app.gui.refresh import refresh
 
 class SettingsPage(QWidget):
     theme_changed = pyqtSignal(str) # Emits theme name ("Dark" or "Light")
 
-    def __init__(self, backend, global_settings, save_callback=None, startup_callback=None):
+    def __init__(self, backend, global_settings, save_callback=None, startup_callback=None, render_stats=None,
+                 connect_callback=None):
         super().__init__()
         self.backend = backend
         self.global_settings = global_settings
         self.save_callback = save_callback
         self.startup_callback = startup_callback
+        self.connect_callback = connect_callback
+        self.render_stats = render_stats if render_stats is not None else {}
         self.init_ui()
 
+        self.stats_timer = refresh.schedule(self, 1000, self.update_render_stats)
+
     def init_ui(self):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
@@ -64,14 +71,33 @@ class SettingsPage(QWidget):
         self.chk_tray_minimize.setToolTip("When clicking X, minimize to tray instead of quitting.")
         self.chk_tray_minimize.setChecked(self.global_settings.get('minimize_to_tray', True))
         
+        self.chk_restore_frame = QCheckBox("Restore Last Colors on Startup")
+        self.chk_restore_frame.setToolTip("Show the last colors as soon as the app starts, before the effect is loaded.")
+        self.chk_restore_frame.setChecked(self.global_settings.get('restore_last_frame', True))
+        
+        self.chk_leds_off = QCheckBox("Turn LEDs Off on Exit")
+        self.chk_leds_off.setToolTip("Send an all-off frame when quitting instead of leaving the last colors on.")
+        self.chk_leds_off.setChecked(self.global_settings.get('leds_off_on_exit', False))
+        
+        self.chk_control_api = QCheckBox("Local Control API")
+        self.chk_control_api.setToolTip(f"Let scripts on this computer switch profiles and change settings through "
+                                        f"port {self.global_settings.get('control_port', 6750)}. Applies after a restart.")
+        self.chk_control_api.setChecked(self.global_settings.get('control_api', False))
+        
         # Connect signals
         self.chk_start_boot.stateChanged.connect(self.on_start_boot_changed)
         self.chk_start_minimized.stateChanged.connect(lambda s: self.update_setting('start_minimized', s == 2))
         self.chk_tray_minimize.stateChanged.connect(lambda s: self.update_setting('minimize_to_tray', s == 2))
+        self.chk_leds_off.stateChanged.connect(lambda s: self.update_setting('leds_off_on_exit', s == 2))
+        self.chk_restore_frame.stateChanged.connect(lambda s: self.update_setting('restore_last_frame', s == 2))
+        self.chk_control_api.stateChanged.connect(lambda s: self.update_setting('control_api', s == 2))
         
         behavior_layout.addWidget(self.chk_start_boot)
         behavior_layout.addWidget(self.chk_start_minimized)
         behavior_layout.addWidget(self.chk_tray_minimize)
+        behavior_layout.addWidget(self.chk_leds_off)
+        behavior_layout.addWidget(self.chk_restore_frame)
+        behavior_layout.addWidget(self.chk_control_api)
         behavior_group.setLayout(behavior_layout)
         layout.addWidget(behavior_group)
         
@@ -96,8 +122,54 @@ class SettingsPage(QWidget):
         brightness_layout.addWidget(self.brightness_slider)
         brightness_layout.addWidget(self.brightness_lbl)
         
+        self.chk_parallel = QCheckBox("Parallel Rendering")
+        self.chk_parallel.setToolTip(
+            f"Render in worker processes when there are more than "
+            f"{self.global_settings.get('parallel_threshold', 5000)} LEDs.")
+        self.chk_parallel.setChecked(self.global_settings.get('parallel_render', False))
+        self.chk_parallel.stateChanged.connect(lambda s: self.update_setting('parallel_render', s == 2))
+        
+        self.chk_idle = QCheckBox("Idle When Static")
+        self.chk_idle.setToolTip("Stop rendering while nothing is animated; "
+                                 "only unchanged keep-alive frames are sent.")
+        self.chk_idle.setChecked(self.global_settings.get('idle_mode', True))
+        self.chk_idle.stateChanged.connect(lambda s: self.update_setting('idle_mode', s == 2))
+        
+        self.chk_adaptive = QCheckBox("Adaptive Frame Rate")
+        self.chk_adaptive.setToolTip("Lower the frame rate for static scenes or when frames take too long, "
+                                     "up to the target frame rate.")
+        self.chk_adaptive.setChecked(self.global_settings.get('adaptive_fps', False))
+        self.chk_adaptive.stateChanged.connect(lambda s: self.update_setting('adaptive_fps', s == 2))
+        
+        self.fps_min = QSpinBox()
+        self.fps_min.setRange(1, 144)
+        self.fps_min.setValue(int(self.global_settings.get('fps_min', 15)))
+        self.fps_min.setSuffix(" FPS")
+        self.fps_min.setToolTip("Lowest frame rate the adaptive mode may choose.")
+        self.fps_min.valueChanged.connect(lambda v: self.update_setting('fps_min', v))
+        
+        self.fps_status_lbl = QLabel("")
+        self.fps_status_lbl.setStyleSheet("color: #888;")
+        
+        self.keepalive_spin = QDoubleSpinBox()
+        self.keepalive_spin.setRange(0.0, 30.0)
+        self.keepalive_spin.setSingleStep(0.5)
+        self.keepalive_spin.setDecimals(1)
+        self.keepalive_spin.setValue(float(self.global_settings.get('keepalive_interval', 1.0)))
+        self.keepalive_spin.setSuffix(" s")
+        self.keepalive_spin.setSpecialValueText("Send every frame")
+        self.keepalive_spin.setToolTip("Unchanged frames are only re-sent this often. "
+                                       "Lower it if a device falls back to its own effect.")
+        self.keepalive_spin.valueChanged.connect(lambda v: self.update_setting('keepalive_interval', v))
+        
         perf_layout.addRow("Target Frame Rate:", self.fps_limit)
+        perf_layout.addRow("", self.chk_adaptive)
+        perf_layout.addRow("", self.chk_idle)
+        perf_layout.addRow("Minimum Frame Rate:", self.fps_min)
+        perf_layout.addRow("Current:", self.fps_status_lbl)
         perf_layout.addRow("Global Brightness:", brightness_layout)
+        perf_layout.addRow("Keep-alive Resend:", self.keepalive_spin)
+        perf_layout.addRow("", self.chk_parallel)
         
         perf_group.setLayout(perf_layout)
         layout.addWidget(perf_group)
@@ -121,6 +193,11 @@ class SettingsPage(QWidget):
         self.port_input.setValue(int(self.global_settings.get('openrgb_port', 6742)))
         self.port_input.valueChanged.connect(lambda v: self.update_setting('openrgb_port', int(v)))
         
+        self.servers_input = QLineEdit(", ".join(str(x) for x in self.global_settings.get('openrgb_servers', [])))
+        self.servers_input.setPlaceholderText("e.g., 192.168.1.20:6742, 192.168.1.21")
+        self.servers_input.setToolTip("Other OpenRGB servers whose devices join the same effect (applies on restart)")
+        self.servers_input.textChanged.connect(self.on_servers_changed)
+        
         self.chk_auto_connect = QCheckBox("Auto-connect on Startup")
         self.chk_auto_connect.setChecked(self.global_settings.get('auto_connect', True))
         self.chk_auto_connect.stateChanged.connect(lambda s: self.update_setting('auto_connect', s == 2))
@@ -130,8 +207,13 @@ class SettingsPage(QWidget):
         
         conn_layout.addRow("Host IP:", self.host_input)
         conn_layout.addRow("Port:", self.port_input)
+        conn_layout.addRow("Additional Servers:", self.servers_input)
         conn_layout.addRow("", self.chk_auto_connect)
         conn_layout.addRow("", self.connect_btn)
+
+        self.conn_status_lbl = QLabel("")
+        self.conn_status_lbl.setWordWrap(True)
+        conn_layout.addRow("", self.conn_status_lbl)
         
         conn_group.setLayout(conn_layout)
         layout.addWidget(conn_group)
@@ -200,15 +282,43 @@ class SettingsPage(QWidget):
         self.update_setting('brightness', value / 100.0)
 
     def on_connect_clicked(self):
-        host = self.host_input.text()
+        host = self.host_input.text().strip()
         port = self.port_input.value()
-        # Logic to reconnect backend would go here
-        # For now, just print or show status
-        _ = (host, port)
-        # In a real app, we would call self.backend.connect(host, port) if supported
+        if host in ("0.0.0.0", "::"):
+            host = "127.0.0.1"
+
+        if not hasattr(self.backend, 'reconnect'):
+            # Nothing connected yet (auto-connect off or it failed): start the
+            # backend from the fields, which are already in the settings
+            if self.connect_callback is None:
+                self.conn_status_lbl.setText("No OpenRGB backend is active. Restart ARES to connect.")
+                return
+            self.conn_status_lbl.setText(f"Connecting to {host}:{port}...")
+            self.connect_callback()
+            return
+
+        # Reconnects in the background; rendering keeps running meanwhile
+        self.backend.reconnect(host, port)
+        self.conn_status_lbl.setText(f"Connecting to {host}:{port}...")
         
+    def on_servers_changed(self, text):
+        servers = [part.strip() for part in text.split(",") if part.strip()]
+        self.update_setting('openrgb_servers', servers)
+
+    def update_render_stats(self):
+        # Paused or idle before the first frame: fps and reason only
+        stats = self.render_stats
+        if 'fps' not in stats:
+            return
+        text = (f"{stats['fps']:.0f} FPS, render {stats.get('render_ms', 0.0):.1f} ms, "
+                f"output {stats.get('push_ms', 0.0):.1f} ms")
+        if (stats.get('adaptive') or stats.get('idle')) and stats.get('reason'):
+            text += f" ({stats['reason']})"
+        self.fps_status_lbl.setText(text)
+
     def update_setting(self, key, value):
         self.global_settings[key] = value
+        wake()
         if self.save_callback:
             self.save_callback()
 
@@ -1,14 +1,73 @@
 from PyQt6.QtWidgets import QWidget
-from PyQt6.QtCore import Qt, QPointF
-from PyQt6.QtGui import QPainter, QColor, QBrush, QPen, QRadialGradient, QLinearGradient
+from PyQt6.QtCore import Qt, QPointF, QRectF
+from PyQt6.QtGui import QPainter, QColor, QBrush, QRadialGradient, QLinearGradient, QPixmap, QImage
+import numpy as np
+
+class SpriteCache:
+    """
+    Pre-rendered LED glow, body and shine pixmaps keyed by size and color.
+    Colors are quantized to 5 bits per channel so a moving effect reuses a
+    bounded set of sprites; the cache is dropped when it grows too large.
+    """
+    MAX_SPRITES = 4096
+
+    def __init__(self):
+        self.sprites = {}
+
+    def get(self, kind, size, color, dpr):
+        r, g, b = color
+        key = (kind, size, r >> 3, g >> 3, b >> 3, dpr)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            if len(self.sprites) >= self.MAX_SPRITES:
+                self.sprites.clear()
+            sprite = self.sprites[key] = self.render(kind, size, r, g, b, dpr)
+        return sprite
+
+    def render(self, kind, size, r, g, b, dpr):
+        # size is the sprite's diameter in logical pixels
+        pixmap = QPixmap(max(1, round(size * dpr)), max(1, round(size * dpr)))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        center = QPointF(size / 2, size / 2)
+        radius = size / 2
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        if kind == 'glow':
+            glow = QRadialGradient(center, radius)
+            glow.setColorAt(0, QColor(r, g, b, 120))
+            glow.setColorAt(0.5, QColor(r, g, b, 30))
+            glow.setColorAt(1, QColor(r, g, b, 0))
+            painter.setBrush(QBrush(glow))
+        elif kind == 'body':
+            # Base color (dimmer version of light)
+            painter.setBrush(QBrush(QColor(max(20, int(r*0.8)), max(20, int(g*0.8)), max(20, int(b*0.8)))))
+        else:
+            # Hotspot/Reflection (shiny plastic look), offset up and left
+            shine_grad = QRadialGradient(QPointF(center.x() - size*0.15, center.y() - size*0.15), radius)
+            shine_grad.setColorAt(0, QColor(255, 255, 255, 200))
+            shine_grad.setColorAt(1, QColor(255, 255, 255, 0))
+            painter.setBrush(QBrush(shine_grad))
+        painter.drawEllipse(center, radius, radius)
+        painter.end()
+        return pixmap
 
 class VisualizerWidget(QWidget):
+    # Below this many pixels per LED the strip is drawn as a scaled image
+    MIN_SPRITE_SPACE = 3.0
+
     def __init__(self, led_count=50):
         super().__init__()
         self.setMinimumHeight(120)
-        self.led_colors = [(0, 0, 0)] * led_count
+        self.frame = np.zeros((led_count, 3), dtype=np.uint8)
+        self.led_colors = None # Per-LED tuples, built only for sprite drawing
         self.led_count = led_count
         self.setAutoFillBackground(True)
+        self.sprites = SpriteCache()
+        self.track = None # Cached track pixmap
+        self.track_key = None
         self.update_theme("Dark") # Default
         
     def update_theme(self, theme_name):
@@ -19,30 +78,37 @@ class VisualizerWidget(QWidget):
         else:
             p.setColor(self.backgroundRole(), QColor("#1e1e1e"))
         self.setPalette(p)
+        self.track = None
         self.update()
 
     def update_data(self, colors):
         """
-        colors: list of (r, g, b) tuples
+        colors: list of (r, g, b) tuples or an (n, 3) uint8 array
         """
-        self.led_colors = colors
-        self.led_count = len(colors)
+        self.frame = np.ascontiguousarray(colors, dtype=np.uint8).reshape(-1, 3)
+        self.led_colors = None
+        self.led_count = len(self.frame)
         self.update() # Trigger paintEvent
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
+    def track_pixmap(self, w, h, dpr):
+        # Redrawn only on resize or theme change
+        key = (w, h, dpr, self.theme_name)
+        if self.track is not None and self.track_key == key:
+            return self.track
+
+        track = QPixmap(max(1, round(w * dpr)), max(1, round(h * dpr)))
+        track.setDevicePixelRatio(dpr)
+        track.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(track)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
-        w = self.width()
-        h = self.height()
-        
+
         # Draw Background Track/Casing
         track_height = 50
         track_y = (h - track_height) / 2
         
         # Outer casing with gradient
         track_grad = QLinearGradient(0, track_y, 0, track_y + track_height)
-        if hasattr(self, 'theme_name') and self.theme_name == "Light":
+        if self.theme_name == "Light":
             track_grad.setColorAt(0, QColor("#e0e0e0"))
             track_grad.setColorAt(0.2, QColor("#ffffff"))
             track_grad.setColorAt(0.8, QColor("#ffffff"))
@@ -56,6 +122,23 @@ class VisualizerWidget(QWidget):
         painter.setPen(Qt.PenStyle.NoPen)
         painter.setBrush(QBrush(track_grad))
         painter.drawRoundedRect(10, int(track_y), int(w - 20), int(track_height), 10, 10)
+        painter.end()
+
+        self.track = track
+        self.track_key = key
+        return track
+
+    def resizeEvent(self, event):
+        self.track = None
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        
+        w = self.width()
+        h = self.height()
+        dpr = self.devicePixelRatioF()
+        painter.drawPixmap(0, 0, self.track_pixmap(w, h, dpr))
         
         if self.led_count == 0:
             return
@@ -70,6 +153,9 @@ class VisualizerWidget(QWidget):
             return
 
         space_per_led = available_w / self.led_count
+        if space_per_led < self.MIN_SPRITE_SPACE:
+            self.paint_image(painter, available_w, h)
+            return
         
         # Calculate padding and size dynamically
         padding = min(6, space_per_led * 0.3)
@@ -80,19 +166,22 @@ class VisualizerWidget(QWidget):
             led_size = 30
             padding = 6 # Reset padding to standard if we are hitting max size
             
-        # If LEDs are super tiny, we might just have to deal with it or draw simple rects
-        # But let's keep min size reasonable, but strictly enforce fit?
-        # If we enforce min size 4, and it doesn't fit, we overflow.
-        # Better to scale down or overlap? Addressable strips usually don't overlap.
-        # Let's allow them to get very small if needed, but < 2 is invisible.
-        led_size = max(1, led_size)
-        
         # Recalculate total used width based on final size
         # We center the actual used width
         total_content_w = (led_size + padding) * self.led_count - padding # Remove last padding
         
         start_x = (w - total_content_w) / 2
         led_y = h / 2
+
+        # Sprites come in whole-pixel sizes so they can be reused
+        body_size = max(1, round(led_size))
+        glow_size = max(1, round(led_size * 5))
+        shine = self.sprites.get('shine', body_size, (255, 255, 255), dpr) if led_size > 4 else None
+        sprites = self.sprites
+
+        # Plain ints are much faster to unpack per LED than NumPy scalars
+        if self.led_colors is None:
+            self.led_colors = self.frame.tolist()
         
         for i, color in enumerate(self.led_colors):
             r, g, b = color
@@ -100,31 +189,28 @@ class VisualizerWidget(QWidget):
             center_x = start_x + i * (led_size + padding) + led_size / 2
             
             # 1. Draw Glow (if lit)
-            # Clip glow to widget bounds if needed, but QPainter clips automatically to widget rect.
-            # If we want to clip to "Track", we can set a clip path.
-            # But usually glow extends.
             if r > 20 or g > 20 or b > 20:
-                glow_radius = led_size * 2.5
-                glow = QRadialGradient(QPointF(center_x, led_y), glow_radius)
-                glow.setColorAt(0, QColor(r, g, b, 120))
-                glow.setColorAt(0.5, QColor(r, g, b, 30))
-                glow.setColorAt(1, QColor(r, g, b, 0))
-                
-                painter.setBrush(QBrush(glow))
-                painter.drawEllipse(QPointF(center_x, led_y), glow_radius, glow_radius)
+                painter.drawPixmap(QPointF(center_x - glow_size / 2, led_y - glow_size / 2),
+                                   sprites.get('glow', glow_size, color, dpr))
 
             # 2. Draw LED Body
-            # Base color (dimmer version of light)
-            base_color = QColor(max(20, int(r*0.8)), max(20, int(g*0.8)), max(20, int(b*0.8)))
-            painter.setBrush(QBrush(base_color))
-            painter.drawEllipse(QPointF(center_x, led_y), led_size/2, led_size/2)
+            corner = QPointF(center_x - body_size / 2, led_y - body_size / 2)
+            painter.drawPixmap(corner, sprites.get('body', body_size, color, dpr))
             
-            if led_size > 4: # Only draw reflection if large enough
-                # 3. Draw Hotspot/Reflection (shiny plastic look)
-                shine_grad = QRadialGradient(QPointF(center_x - led_size*0.15, led_y - led_size*0.15), led_size/2)
-                shine_grad.setColorAt(0, QColor(255, 255, 255, 200))
-                shine_grad.setColorAt(1, QColor(255, 255, 255, 0))
-                
-                painter.setBrush(QBrush(shine_grad))
-                painter.drawEllipse(QPointF(center_x, led_y), led_size/2, led_size/2)
+            # 3. Draw Hotspot/Reflection, only if large enough
+            if shine is not None:
+                painter.drawPixmap(corner, shine)
+
+    def paint_image(self, painter, available_w, h):
+        # Too many LEDs for one sprite each: wrap the frame in a one-row
+        # image and let Qt scale it, so the cost doesn't grow with LED count
+        image = QImage(self.frame.data, self.led_count, 1, self.led_count * 3, QImage.Format.Format_RGB888)
+        strip_h = 14
+        led_y = h / 2
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
 
+        # Soft glow band behind the strip
+        painter.setOpacity(0.35)
+        painter.drawImage(QRectF(20, led_y - strip_h * 1.5, available_w, strip_h * 3), image)
+        painter.setOpacity(1.0)
+        painter.drawImage(QRectF(20, led_y - strip_h / 2, available_w, strip_h), image)
@@ -0,0 +1,158 @@
+import threading
+import time
+
+from app.creator.nodes import NODE_CLASSES
+
+def coerce_param(current, value):
+    """
+    Converts a JSON value to the type of the layer's current param: enums
+    are (selected, options) tuples, colors are tuples, numbers keep their
+    int/float kind.
+    """
+    if isinstance(current, tuple) and len(current) == 2 and isinstance(current[1], list):
+        if value not in current[1]:
+            raise ValueError(f"must be one of {current[1]}")
+        return (value, current[1])
+    if isinstance(current, tuple):
+        if len(value) != len(current):
+            raise ValueError(f"expected {len(current)} values")
+        return tuple(type(c)(v) for c, v in zip(current, value))
+    if isinstance(current, bool):
+        return bool(value)
+    if isinstance(current, (int, float)):
+        return type(current)(value)
+    return value
+
+class ControlCommands:
+    """
+    Control API commands for a running engine (see ControlServer). Every
+    change is handed to the render thread with Renderer.call_soon and the
+    reply is sent once it has been applied, so the next frame shows it.
+
+    on_change(what), if given, runs on the render thread after a profile
+    load ('profile') or a param change ('param').
+    """
+    APPLY_TIMEOUT_S = 1.0
+
+    def __init__(self, renderer, effect, settings, profiles, backend, render_stats, profile=None, on_change=None):
+        self.renderer = renderer
+        self.effect = effect
+        self.settings = settings
+        self.profiles = profiles
+        self.backend = backend
+        self.render_stats = render_stats
+        self.profile = profile
+        self.on_change = on_change
+
+    def table(self):
+        return {
+            'list_profiles': self.cmd_list_profiles,
+            'load_profile': self.cmd_load_profile,
+            'reload_profile': self.cmd_reload_profile,
+            'layers': self.cmd_layers,
+            'set_param': self.cmd_set_param,
+            'brightness': self.cmd_brightness,
+            'fps': self.cmd_fps,
+            'stats': self.cmd_stats,
+            'watch_stats': self.cmd_watch_stats,
+        }
+
+    def apply(self, fn, *args):
+        # Runs fn on the render thread between two frames and waits for it
+        if not self.renderer.running:
+            fn(*args)
+            return
+        done = threading.Event()
+        def run():
+            try:
+                fn(*args)
+            finally:
+                done.set()
+        self.renderer.call_soon(run)
+        if not done.wait(self.APPLY_TIMEOUT_S):
+            raise TimeoutError("render thread did not apply the change in time")
+
+    def changed(self, what):
+        if self.on_change:
+            self.on_change(what)
+
+    def load_profile(self, name):
+        # Names come from the socket; keep them inside the profiles folder
+        if not isinstance(name, str) or not name or '..' in name or any(c in name for c in '/\\:'):
+            raise ValueError(f"invalid profile name: {name}")
+        data = self.profiles.load_profile(name)
+        if data is None:
+            raise ValueError(f"profile not found: {name}")
+        def load():
+            self.effect.load_from_dict(data, NODE_CLASSES)
+            self.changed('profile')
+        self.apply(load)
+        self.profile = name
+
+    def cmd_list_profiles(self, request):
+        return {'profiles': sorted(self.profiles.list_profiles()), 'current': self.profile}
+
+    def cmd_load_profile(self, request):
+        self.load_profile(request['name'])
+        return {'profile': request['name']}
+
+    def cmd_reload_profile(self, request):
+        # Re-reads the current profile from disk; 'name' switches to another one
+        name = request.get('name') or self.profile
+        if not name:
+            raise ValueError("no profile loaded")
+        self.load_profile(name)
+        return {'profile': name}
+
+    def cmd_layers(self, request):
+        return {'layers': [{'index': i, **layer.to_dict()} for i, layer in enumerate(self.effect.layers)]}
+
+    def cmd_set_param(self, request):
+        index, key = int(request['layer']), request['key']
+        layers = self.effect.layers
+        if not 0 <= index < len(layers):
+            raise ValueError(f"no layer {index}")
+        layer = layers[index]
+        if key not in layer.params:
+            raise ValueError(f"{layer.name} has no param '{key}'")
+        value = coerce_param(layer.params[key], request['value'])
+        def set_param():
+            layer.set_param(key, value)
+            self.changed('param')
+        self.apply(set_param)
+        return {'layer': index, 'key': key, 'value': value}
+
+    def cmd_brightness(self, request):
+        value = min(1.0, max(0.0, float(request['value'])))
+        self.apply(self.settings.__setitem__, 'brightness', value)
+        return {'brightness': value}
+
+    def cmd_fps(self, request):
+        value = max(1, int(request['value']))
+        self.apply(self.settings.__setitem__, 'fps_limit', value)
+        return {'fps_limit': value}
+
+    def cmd_stats(self, request):
+        stats = {'profile': self.profile, 'leds': len(self.renderer.leds), 'render': dict(self.render_stats)}
+        frame_stats = getattr(getattr(self.backend, 'target', self.backend), 'frame_stats', None)
+        if frame_stats:
+            stats['output'] = frame_stats()
+        server_stats = getattr(getattr(self.backend, 'target', self.backend), 'server_stats', None)
+        if server_stats:
+            stats['servers'] = server_stats()
+        return stats
+
+    def cmd_watch_stats(self, request):
+        """
+        Streams a stats reply every 'interval' seconds until the client
+        disconnects, or 'count' replies were sent.
+        """
+        interval = max(0.05, float(request.get('interval', 1.0)))
+        count = request.get('count')
+        def stream():
+            sent = 0
+            while count is None or sent < count:
+                yield self.cmd_stats(request)
+                sent += 1
+                time.sleep(interval)
+        return stream()
@@ -0,0 +1,89 @@
+import json
+import socketserver
+import threading
+
+class ControlHandler(socketserver.StreamRequestHandler):
+    disable_nagle_algorithm = True # Replies are small and latency matters
+
+    # One JSON object per line in, one JSON reply per line out (or a stream
+    # of replies for streaming commands)
+    def handle(self):
+        for line in self.rfile:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+                reply = self.server.control.dispatch(request)
+            except ValueError as e:
+                reply = {'ok': False, 'error': f"bad request: {e}"}
+            replies = [reply] if isinstance(reply, dict) else reply
+            # A streaming command runs as it is read; report its failure and hang up
+            try:
+                for reply in replies:
+                    if not self.send(reply):
+                        return
+            except KeyError as e:
+                self.send({'ok': False, 'error': f"missing field: {e}"})
+                return
+            except Exception as e:
+                self.send({'ok': False, 'error': str(e)})
+                return
+
+    def send(self, reply):
+        # False once the client has gone
+        try:
+            self.wfile.write(json.dumps(reply).encode('utf-8') + b'\n')
+            return True
+        except OSError:
+            return False
+
+class ControlServer:
+    """
+    Local control API: newline-delimited JSON over TCP, bound to localhost
+    by default. A request names a command, e.g.
+
+        {"cmd": "brightness", "value": 0.5}
+
+    and gets {"ok": true, ...} or {"ok": false, "error": "..."} back.
+    commands maps names to callables taking the request dict and returning
+    a dict of extra reply fields, or a generator of such dicts to stream
+    several replies.
+    """
+    def __init__(self, commands, host='127.0.0.1', port=6750):
+        self.commands = commands
+        self.server = socketserver.ThreadingTCPServer((host, port), ControlHandler, bind_and_activate=False)
+        self.server.daemon_threads = True
+        self.server.allow_reuse_address = True
+        self.server.control = self
+        self.server.server_bind()
+        self.server.server_activate()
+        self.thread = None
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def dispatch(self, request):
+        command = self.commands.get(request.get('cmd'))
+        if command is None:
+            return {'ok': False, 'error': f"unknown command: {request.get('cmd')}"}
+        try:
+            reply = command(request) or {}
+        except KeyError as e:
+            return {'ok': False, 'error': f"missing field: {e}"}
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
+        if isinstance(reply, dict):
+            return {'ok': True, **reply}
+        return ({'ok': True, **item} for item in reply)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="control", daemon=True)
+        self.thread.start()
+        return self
+
+    def close(self):
+        if self.thread is not None:
+            self.server.shutdown()
+        self.server.server_close()
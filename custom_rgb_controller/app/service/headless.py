@@ -0,0 +1,97 @@
+import signal
+import threading
+import time
+
+from app.core.led_map import LedMap
+from app.core.profiles import ProfileManager
+from app.core.settings import load_settings
+from app.creator.engine import CreatorEffect
+from app.engine.renderer import Renderer
+from app.backend.startup import BackendStarter, BackendSwitch, NullBackend
+from app.backend.first_light import LastFrameSaver
+from app.service.control import ControlServer
+from app.service.commands import ControlCommands
+
+class HeadlessService:
+    """
+    The lighting engine without the GUI: settings, one CreatorEffect loaded
+    from a profile, the renderer and the OpenRGB backend. Nothing here
+    imports Qt. A ControlServer on 'control_port' (0 disables it) drives
+    it while running, see ControlCommands for the commands.
+    """
+    SAVE_INTERVAL_S = 10.0
+
+    def __init__(self, settings_file=None, profile=None, control_port=None):
+        self.settings = load_settings(settings_file)
+        self.profile = profile or self.settings.get('favorite_profile')
+        self.profiles = ProfileManager()
+        self.effect = CreatorEffect()
+        self.backend = BackendSwitch(NullBackend())
+        self.render_stats = {}
+        self.renderer = Renderer(LedMap.from_count(100), [self.effect], self.backend, self.settings,
+                                 stats=self.render_stats)
+        self.frame_saver = LastFrameSaver()
+        self.status = 'starting'
+        self.stopping = threading.Event()
+
+        self.commands = ControlCommands(self.renderer, self.effect, self.settings, self.profiles, self.backend,
+                                        self.render_stats, self.profile)
+        table = self.commands.table()
+        stats = table['stats']
+        table['stats'] = lambda request: {'status': self.status, **stats(request)}
+        port = self.settings.get('control_port', 6750) if control_port is None else control_port
+        self.control = ControlServer(table, port=port) if port else None
+
+    def on_status(self, status):
+        self.status = status
+        print(f"OpenRGB: {status}")
+
+    def start(self):
+        self.renderer.start()
+        if self.profile:
+            try:
+                self.commands.load_profile(self.profile)
+            except ValueError as e:
+                print(e)
+        if self.settings.get('auto_connect', True):
+            BackendStarter(self.settings, self.backend.set_target, self.on_status).start()
+        if self.control is not None:
+            self.control.start()
+            print(f"Control API listening on 127.0.0.1:{self.control.port}")
+
+    def stop(self):
+        self.stopping.set()
+
+    def save_last_frame(self):
+        if self.settings.get('restore_last_frame', True):
+            self.frame_saver.save(self.renderer.last_frame, self.backend)
+
+    def run(self):
+        """
+        Runs until stop() or SIGINT/SIGTERM, saving the last frame now and
+        then, and shuts down like the GUI does on quit.
+        """
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: self.stop())
+        self.start()
+
+        last_save = time.monotonic()
+        # Short waits so signals are handled promptly on every platform
+        while not self.stopping.wait(0.5):
+            if time.monotonic() - last_save >= self.SAVE_INTERVAL_S:
+                self.save_last_frame()
+                last_save = time.monotonic()
+        self.shutdown()
+
+    def shutdown(self):
+        if self.control is not None:
+            self.control.close()
+        self.save_last_frame()
+        final_frame = 'off' if self.settings.get('leds_off_on_exit', False) else None
+        self.renderer.stop(timeout=2.0, final_frame=final_frame)
+        close = getattr(self.backend, 'close', None)
+        if close:
+            close()
+
+def run_headless(profile=None):
+    HeadlessService(profile=profile).run()
@@ -0,0 +1,92 @@
+"""
+Measures control API latency from a local client: the time until the reply
+to a set_param command arrives (the change was applied on the render
+thread) and until the new color shows on the fake SDK server's devices.
+Runs with idle mode on and off, since an idle renderer has to be woken.
+
+Run from the custom_rgb_controller directory:
+    python -m benchmarks.bench_control_latency [--runs 200] [--leds 300]
+"""
+import argparse
+import json
+import os
+import socket
+import tempfile
+import time
+import numpy as np
+
+from app.creator.nodes import SolidColorLayer
+from app.service.headless import HeadlessService
+from benchmarks.fake_server import FakeOpenRGBServer
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_for(check, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if check():
+            return True
+        time.sleep(0.0002)
+    return False
+
+def percentiles(times):
+    ms = np.array(times) * 1000
+    return np.percentile(ms, 50), np.percentile(ms, 95), ms.max()
+
+def bench(server, idle_mode, runs):
+    settings = {'openrgb_port': server.port, 'idle_mode': idle_mode, 'restore_last_frame': False,
+                'leds_off_on_exit': False, 'favorite_profile': None}
+    fd, settings_file = tempfile.mkstemp(suffix='.json')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(settings, f)
+
+    service = HeadlessService(settings_file, control_port=free_port())
+    service.effect.add_layer(SolidColorLayer())
+    service.start()
+    try:
+        if not wait_for(lambda: service.status == 'ready'):
+            raise RuntimeError("could not connect to the fake server")
+        client = socket.create_connection(("127.0.0.1", service.control.port))
+        client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        replies = client.makefile('rb')
+
+        acked, shown = [], []
+        for i in range(runs):
+            color = (i % 256, 255 - i % 256, 7)
+            # Let an idle renderer park again so every run includes the wake-up
+            time.sleep(0.02)
+            start = time.perf_counter()
+            client.sendall(json.dumps({'cmd': 'set_param', 'layer': 0, 'key': 'color', 'value': color}).encode() + b'\n')
+            if not json.loads(replies.readline())['ok']:
+                raise RuntimeError("set_param failed")
+            acked.append(time.perf_counter() - start)
+            if not wait_for(lambda: tuple(server.device_colors(0)[0]) == color):
+                raise RuntimeError("color never reached the device")
+            shown.append(time.perf_counter() - start)
+        client.close()
+        return percentiles(acked), percentiles(shown)
+    finally:
+        service.shutdown()
+        os.remove(settings_file)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=200)
+    parser.add_argument('--leds', type=int, default=300)
+    args = parser.parse_args()
+
+    server = FakeOpenRGBServer.with_strips(1, args.leds).start()
+    try:
+        print(f"{'idle':>6} {'':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+        for idle_mode in (True, False):
+            acked, shown = bench(server, idle_mode, args.runs)
+            for label, (p50, p95, worst) in (('reply', acked), ('device', shown)):
+                print(f"{str(idle_mode):>6} {label:>8} {p50:>8.2f} {p95:>8.2f} {worst:>8.2f}")
+    finally:
+        server.stop()
+
+if __name__ == '__main__':
+    main()
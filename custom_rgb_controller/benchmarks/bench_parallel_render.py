@@ -0,0 +1,78 @@
+"""
+Compares single-threaded rendering with the process-pool renderer.
+
+Run from the custom_rgb_controller directory:
+    python -m benchmarks.bench_parallel_render [--leds 2000 5000 10000] [--frames 100]
+"""
+import argparse
+import time
+import numpy as np
+
+from app.core.led_map import LedMap
+from app.creator.engine import CreatorEffect
+from app.creator.nodes import GradientLayer, WaveLayer, NoiseLayer, CheckerboardLayer
+from app.engine.parallel import ParallelRenderer
+from app.engine.renderer import to_frame
+
+def build_effect():
+    effect = CreatorEffect()
+    effect.add_layer(GradientLayer())
+    wave = WaveLayer()
+    wave.set_param('blend_mode', ('Add', []))
+    effect.add_layer(wave)
+    noise = NoiseLayer()
+    noise.set_param('blend_mode', ('Screen', []))
+    effect.add_layer(noise)
+    checker = CheckerboardLayer()
+    checker.set_param('opacity', 0.2)
+    effect.add_layer(checker)
+    return effect
+
+def build_leds(count):
+    # Split into strips of 300 like a large ARGB installation
+    specs = []
+    remaining = count
+    while remaining > 0:
+        n = min(300, remaining)
+        specs.append((f"Strip {len(specs)}", [("Strip", n)]))
+        remaining -= n
+    return LedMap(specs)
+
+def bench_single(leds, effect, frames):
+    start = time.perf_counter()
+    for i in range(frames):
+        frame = to_frame(effect.render(leds, i / 60.0))
+    return (time.perf_counter() - start) / frames, frame
+
+def bench_parallel(leds, effect, frames, workers):
+    renderer = ParallelRenderer(leds, workers)
+    try:
+        renderer.render(effect, 0.0) # Warm up worker imports
+        start = time.perf_counter()
+        for i in range(frames):
+            frame = renderer.render(effect, i / 60.0)
+        return (time.perf_counter() - start) / frames, frame.copy(), len(renderer.shards)
+    finally:
+        renderer.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--leds', type=int, nargs='+', default=[2000, 5000, 10000, 20000])
+    parser.add_argument('--frames', type=int, default=60)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    print(f"{'LEDs':>8} {'single ms':>10} {'parallel ms':>12} {'workers':>8} {'speedup':>8} {'match':>6}")
+    for count in args.leds:
+        leds = build_leds(count)
+        effect = build_effect()
+        single, single_frame = bench_single(leds, effect, args.frames)
+        parallel, parallel_frame, workers = bench_parallel(leds, effect, args.frames, args.workers)
+
+        # Compare the last frames (same t) to check the shards line up
+        match = np.array_equal(single_frame, parallel_frame)
+        print(f"{count:>8} {single * 1000:>10.2f} {parallel * 1000:>12.2f} {workers:>8} "
+              f"{single / parallel:>7.2f}x {str(match):>6}")
+
+if __name__ == '__main__':
+    main()
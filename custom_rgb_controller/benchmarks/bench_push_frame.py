@@ -0,0 +1,75 @@
+"""
+Measures OpenRGBBackend.push_frame against the fake SDK server, comparing
+per-device senders, the batched UpdateLEDs writer and openrgb-python's
+set_colors. Per-device senders skip frames a device can't keep up with, so
+"applied" counts the updates the server actually received.
+
+Run from the custom_rgb_controller directory:
+    python -m benchmarks.bench_push_frame [--devices 4] [--leds 300 1000] [--frames 200]
+"""
+import argparse
+import time
+import numpy as np
+
+from app.backend.openrgb_backend import OpenRGBBackend
+from benchmarks.fake_server import FakeOpenRGBServer
+
+PATHS = {
+    'device': {'fast_path': True, 'per_device': True},
+    'batch': {'fast_path': True, 'per_device': False},
+    'slow': {'fast_path': False},
+}
+
+def bench_backend(server, path, frames):
+    backend = OpenRGBBackend("127.0.0.1", server.port, **PATHS[path])
+    leds = backend.get_led_map()
+    frame = np.zeros((len(leds), 3), dtype=np.uint8)
+
+    # Clear what the previous run left on the devices
+    with server.lock:
+        for device in server.devices:
+            device.colors[:] = 255
+
+    applied = server.frame_count
+    start = time.perf_counter()
+    for i in range(frames):
+        frame[:] = i % 255
+        backend.push_frame(frame)
+    sent = time.perf_counter() - start
+
+    # Wait until every device shows the last frame, so queued bytes count too
+    last = (frames - 1) % 255
+    deadline = start + 30.0
+    delivered = False
+    while time.perf_counter() < deadline:
+        if all(int(server.device_colors(i)[0, 0]) == last for i in range(len(leds.devices))):
+            delivered = True
+            break
+        time.sleep(0.0005)
+    total = time.perf_counter() - start
+
+    backend.close()
+    return sent / frames, total / frames, server.frame_count - applied, delivered
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--devices', type=int, default=4)
+    parser.add_argument('--leds', type=int, nargs='+', default=[60, 300, 1000])
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.0, help="Per-update device latency in seconds")
+    args = parser.parse_args()
+
+    print(f"{'LEDs/dev':>8} {'devices':>8} {'path':>6} {'send ms':>9} {'deliver ms':>11} {'fps':>8} "
+          f"{'applied':>8} {'ok':>4}")
+    for count in args.leds:
+        server = FakeOpenRGBServer.with_strips(args.devices, count)
+        for device in server.devices:
+            device.latency = args.latency
+        with server:
+            for path in PATHS:
+                sent, total, applied, delivered = bench_backend(server, path, args.frames)
+                print(f"{count:>8} {args.devices:>8} {path:>6} {sent * 1000:>9.3f} {total * 1000:>11.3f} "
+                      f"{1.0 / total:>8.0f} {applied:>8} {str(delivered):>4}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Measures VisualizerWidget repaint cost for growing LED counts.
+
+Run from the custom_rgb_controller directory:
+    python -m benchmarks.bench_visualizer [--leds 50 300 1000 10000] [--frames 60]
+
+Works headless with QT_QPA_PLATFORM=offscreen.
+"""
+import argparse
+import time
+import numpy as np
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QImage, QPainter
+
+from app.gui.visualizer import VisualizerWidget
+
+def bench(count, frames, width, height):
+    widget = VisualizerWidget()
+    widget.resize(width, height)
+    target = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+    hue = np.linspace(0, 2 * np.pi, count, endpoint=False)
+
+    times = []
+    for i in range(frames + 1):
+        # A moving rainbow so sprite caches see changing colors
+        phase = hue + i * 0.1
+        frame = np.stack([np.sin(phase), np.sin(phase + 2.1), np.sin(phase + 4.2)], axis=1)
+        widget.update_data(((frame + 1) * 127.5).astype(np.uint8))
+
+        start = time.perf_counter()
+        painter = QPainter(target)
+        widget.render(painter)
+        painter.end()
+        times.append(time.perf_counter() - start)
+    # The first paint fills the caches
+    return times[0], sum(times[1:]) / frames
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--leds', type=int, nargs='+', default=[50, 300, 1000, 10000])
+    parser.add_argument('--frames', type=int, default=60)
+    parser.add_argument('--width', type=int, default=900)
+    parser.add_argument('--height', type=int, default=160)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    print(f"{'LEDs':>8} {'first ms':>10} {'paint ms':>10}")
+    for count in args.leds:
+        first, avg = bench(count, args.frames, args.width, args.height)
+        print(f"{count:>8} {first * 1000:>10.2f} {avg * 1000:>10.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Checks that the renderer gives up on parallel rendering after
+Renderer.MAX_PARALLEL_FAILURES pools in a row broke, and keeps rendering
+in the main process meanwhile. The pool used here breaks on every frame.
+
+Run from the custom_rgb_controller directory:
+    python -m benchmarks.check_parallel_retry
+"""
+import sys
+import time
+
+from app.core.led_map import LedMap
+from app.creator.engine import CreatorEffect
+from app.creator.nodes import GradientLayer
+from app.engine import renderer as renderer_module
+from app.engine.renderer import Renderer
+
+class BrokenPool:
+    created = 0
+
+    def __init__(self, leds):
+        BrokenPool.created += 1
+        self.broken = False
+
+    @staticmethod
+    def can_render(effect):
+        return True
+
+    def render(self, effect, t):
+        # Like a worker that died: the caller falls back to the main process
+        self.broken = True
+        return None
+
+    def close(self):
+        pass
+
+class FrameCounter:
+    def __init__(self):
+        self.frames = 0
+
+    def push_frame(self, frame):
+        self.frames += 1
+
+def main():
+    leds = LedMap.from_count(100)
+    effect = CreatorEffect()
+    effect.add_layer(GradientLayer())
+    backend = FrameCounter()
+    settings = {'brightness': 1.0, 'identify_device': -1, 'fps_limit': 200,
+                'parallel_render': True, 'parallel_threshold': 0, 'idle_mode': False}
+
+    renderer_module.ParallelRenderer = BrokenPool
+    renderer = Renderer(leds, [effect], backend, settings)
+    renderer.start()
+    time.sleep(0.5)
+    renderer.stop()
+
+    expected = Renderer.MAX_PARALLEL_FAILURES
+    print(f"{backend.frames} frames rendered, {BrokenPool.created} pools started (expected {expected})")
+    if BrokenPool.created != expected or backend.frames < 10:
+        print("FAILED")
+        return 1
+    print("OK")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
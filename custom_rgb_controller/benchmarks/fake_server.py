@@ -0,0 +1,321 @@
+"""
+Stand-in OpenRGB SDK server for integration tests and benchmarks.
+
+Speaks enough of the SDK protocol for openrgb-python and the raw frame
+writer: protocol version, client name, controller count/data, profile and
+plugin lists, UpdateLEDs, UpdateZoneLEDs and UpdateSingleLED. Received
+colors are recorded per device, and latency or disconnects can be injected.
+
+Run standalone:
+    python -m benchmarks.fake_server --devices 4 --leds 300 --port 6742
+"""
+import argparse
+import collections
+import socket
+import struct
+import threading
+import time
+import numpy as np
+
+HEADER = struct.Struct('<4sIII')
+MAGIC = b'ORGB'
+
+PKT_REQUEST_CONTROLLER_COUNT = 0
+PKT_REQUEST_CONTROLLER_DATA = 1
+PKT_REQUEST_PROTOCOL_VERSION = 40
+PKT_SET_CLIENT_NAME = 50
+PKT_DEVICE_LIST_UPDATED = 100
+PKT_REQUEST_PROFILE_LIST = 150
+PKT_REQUEST_PLUGIN_LIST = 200
+PKT_UPDATELEDS = 1050
+PKT_UPDATEZONELEDS = 1051
+PKT_UPDATESINGLELED = 1052
+
+DEVICE_TYPE_LEDSTRIP = 4
+ZONE_TYPE_LINEAR = 1
+ZONE_TYPE_MATRIX = 2
+MODE_FLAG_PER_LED_COLOR = 1 << 5
+MODE_COLORS_PER_LED = 1
+
+def _pack_string(text):
+    raw = text.encode('utf-8') + b'\0'
+    return struct.pack('<H', len(raw)) + raw
+
+class FakeDevice:
+    def __init__(self, name, zones, device_type=DEVICE_TYPE_LEDSTRIP, latency=0.0):
+        # zones: list of (zone_name, led_count[, matrix_map])
+        self.name = name
+        self.zones = [tuple(z) for z in zones]
+        self.device_type = device_type
+        self.latency = latency # Seconds spent "writing" each update
+        self.led_count = sum(z[1] for z in self.zones)
+        self.colors = np.zeros((self.led_count, 3), dtype=np.uint8)
+        self.updates = 0
+
+    def pack(self, version):
+        data = struct.pack('<i', self.device_type) + _pack_string(self.name)
+        if version >= 1:
+            data += _pack_string("Fake Vendor")
+        data += _pack_string("Fake device") + _pack_string("1.0") + _pack_string("") + _pack_string("fake")
+
+        # One "Direct" per-LED mode
+        data += struct.pack('<Hi', 1, 0)
+        data += _pack_string("Direct") + struct.pack('<iIII', 0, MODE_FLAG_PER_LED_COLOR, 0, 0)
+        if version >= 3:
+            data += struct.pack('<II', 0, 0)
+        data += struct.pack('<III', 0, 0, 0)
+        if version >= 3:
+            data += struct.pack('<I', 0)
+        data += struct.pack('<IIH', 0, MODE_COLORS_PER_LED, 0)
+
+        data += struct.pack('<H', len(self.zones))
+        for zone in self.zones:
+            name, count = zone[0], zone[1]
+            matrix = zone[2] if len(zone) > 2 else None
+            zone_type = ZONE_TYPE_MATRIX if matrix else ZONE_TYPE_LINEAR
+            data += _pack_string(name) + struct.pack('<iIII', zone_type, count, count, count)
+            if matrix:
+                height, width = len(matrix), max(len(row) for row in matrix)
+                flat = []
+                for row in matrix:
+                    row = list(row) + [None] * (width - len(row))
+                    flat += [0xFFFFFFFF if v is None else v for v in row]
+                data += struct.pack(f'<HII{len(flat)}I', (len(flat) + 2) * 4, height, width, *flat)
+            else:
+                data += struct.pack('<H', 0)
+            if version >= 4:
+                data += struct.pack('<H', 0) # No segments
+
+        data += struct.pack('<H', self.led_count)
+        for i in range(self.led_count):
+            data += _pack_string(f"LED {i}") + struct.pack('<I', i)
+        data += struct.pack('<H', self.led_count)
+        data += b''.join(struct.pack('<BBBx', *c) for c in self.colors.tolist())
+
+        return struct.pack('<I', len(data) + 4) + data
+
+class FakeOpenRGBServer:
+    def __init__(self, devices=None, host="127.0.0.1", port=0, protocol_version=4, keep_frames=1000):
+        self.devices = list(devices or [])
+        self.host = host
+        self.port = port
+        self.protocol_version = protocol_version
+        self.latency = 0.0 # Extra delay before handling any packet
+
+        self.lock = threading.Lock()
+        self.frames = collections.deque(maxlen=keep_frames) # (time, device index, colors)
+        self.frame_count = 0
+        self.frame_event = threading.Condition(self.lock)
+        self.client_names = []
+        self.requests = collections.Counter() # Packets received, by packet id
+
+        self._sock = None
+        self._clients = []
+        self._running = False
+        self._thread = None
+
+    @classmethod
+    def with_strips(cls, device_count, leds_per_device, **kwargs):
+        devices = [FakeDevice(f"Fake Strip {i}", [("Strip", leds_per_device)]) for i in range(device_count)]
+        return cls(devices, **kwargs)
+
+    def start(self):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self.host, self.port))
+        self._sock.listen(16)
+        self.port = self._sock.getsockname()[1]
+        self._running = True
+        self._thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._sock:
+            # shutdown() wakes the accept thread; close() alone leaves it listening
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+            self._sock = None
+        self.disconnect_clients()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- Fault injection ---
+
+    def disconnect_clients(self):
+        with self.lock:
+            clients, self._clients = self._clients, []
+        for conn in clients:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            conn.close()
+
+    def set_devices(self, devices, notify=True):
+        with self.lock:
+            self.devices = list(devices)
+            clients = list(self._clients)
+        if notify:
+            packet = HEADER.pack(MAGIC, 0, PKT_DEVICE_LIST_UPDATED, 0)
+            for conn in clients:
+                try:
+                    conn.sendall(packet)
+                except OSError:
+                    pass
+
+    # --- Recorded output ---
+
+    def wait_for_frames(self, count, timeout=5.0):
+        deadline = time.perf_counter() + timeout
+        with self.frame_event:
+            while self.frame_count < count:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return False
+                self.frame_event.wait(remaining)
+        return True
+
+    def device_colors(self, index):
+        with self.lock:
+            return self.devices[index].colors.copy()
+
+    # --- Protocol ---
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                break
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self.lock:
+                self._clients.append(conn)
+            threading.Thread(target=self._client_loop, args=(conn,), daemon=True).start()
+
+    def _recv_exact(self, conn, size):
+        buf = bytearray(size)
+        view = memoryview(buf)
+        got = 0
+        while got < size:
+            n = conn.recv_into(view[got:])
+            if n == 0:
+                raise ConnectionError("client closed")
+            got += n
+        return bytes(buf)
+
+    def _send(self, conn, device_id, packet_id, payload):
+        conn.sendall(HEADER.pack(MAGIC, device_id, packet_id, len(payload)) + payload)
+
+    def _client_loop(self, conn):
+        version = self.protocol_version
+        try:
+            while self._running:
+                magic, device_id, packet_id, size = HEADER.unpack(self._recv_exact(conn, HEADER.size))
+                if magic != MAGIC:
+                    break
+                payload = self._recv_exact(conn, size) if size else b''
+                self.requests[packet_id] += 1
+                if self.latency:
+                    time.sleep(self.latency)
+
+                if packet_id == PKT_REQUEST_PROTOCOL_VERSION:
+                    client_version = struct.unpack_from('<I', payload)[0] if len(payload) >= 4 else 0
+                    version = min(client_version, self.protocol_version)
+                    self._send(conn, 0, packet_id, struct.pack('<I', self.protocol_version))
+                elif packet_id == PKT_SET_CLIENT_NAME:
+                    with self.lock:
+                        self.client_names.append(payload.rstrip(b'\0').decode('utf-8', 'replace'))
+                elif packet_id == PKT_REQUEST_CONTROLLER_COUNT:
+                    with self.lock:
+                        count = len(self.devices)
+                    self._send(conn, 0, packet_id, struct.pack('<I', count))
+                elif packet_id == PKT_REQUEST_CONTROLLER_DATA:
+                    if len(payload) >= 4:
+                        version = struct.unpack_from('<I', payload)[0]
+                    with self.lock:
+                        device = self.devices[device_id] if device_id < len(self.devices) else None
+                        data = device.pack(version) if device else b''
+                    self._send(conn, device_id, packet_id, data)
+                elif packet_id in (PKT_REQUEST_PROFILE_LIST, PKT_REQUEST_PLUGIN_LIST):
+                    self._send(conn, 0, packet_id, struct.pack('<IH', 6, 0))
+                elif packet_id == PKT_UPDATELEDS:
+                    count = struct.unpack_from('<H', payload, 4)[0]
+                    self._record(device_id, 0, count, payload[6:6 + 4 * count])
+                elif packet_id == PKT_UPDATEZONELEDS:
+                    zone_idx, count = struct.unpack_from('<IH', payload, 4)
+                    self._record(device_id, zone_idx, count, payload[10:10 + 4 * count], zone=True)
+                elif packet_id == PKT_UPDATESINGLELED:
+                    led = struct.unpack_from('<i', payload)[0]
+                    self._record(device_id, led, 1, payload[4:8])
+                # Everything else (modes, profiles...) is accepted and ignored
+        except (ConnectionError, OSError, struct.error):
+            pass
+        finally:
+            with self.lock:
+                if conn in self._clients:
+                    self._clients.remove(conn)
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    def _record(self, device_id, start, count, raw, zone=False):
+        with self.lock:
+            if device_id >= len(self.devices):
+                return
+            device = self.devices[device_id]
+            if zone:
+                offset = sum(z[1] for z in device.zones[:start])
+            else:
+                offset = start
+            colors = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 4)[:, :3]
+            count = min(count, len(colors), device.led_count - offset)
+            if count <= 0:
+                return
+            device_latency = device.latency
+        if device_latency:
+            time.sleep(device_latency)
+        with self.frame_event:
+            device.colors[offset:offset + count] = colors[:count]
+            device.updates += 1
+            self.frames.append((time.perf_counter(), device_id, device.colors.copy()))
+            self.frame_count += 1
+            self.frame_event.notify_all()
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenRGB SDK server")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=6742)
+    parser.add_argument('--devices', type=int, default=3)
+    parser.add_argument('--leds', type=int, default=60)
+    parser.add_argument('--latency', type=float, default=0.0, help="Per-update device latency in seconds")
+    args = parser.parse_args()
+
+    server = FakeOpenRGBServer.with_strips(args.devices, args.leds, host=args.host, port=args.port)
+    for device in server.devices:
+        device.latency = args.latency
+    server.start()
+    print(f"Fake OpenRGB server on {args.host}:{server.port} with {args.devices} x {args.leds} LEDs")
+    try:
+        while True:
+            time.sleep(1.0)
+            print(f"{server.frame_count} updates received")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+if __name__ == '__main__':
+    main()
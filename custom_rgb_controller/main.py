@@ -1,5 +1,28 @@
-from app.gui.main_window import run_app
+import argparse
+import multiprocessing
 
 if __name__ == "__main__":
-    run_app()
-    
\ No newline at end of file
+    # Start the startup clock before anything heavy is imported
+    from app.core.startup_timing import startup_timer
+
+    # Required for the parallel renderer's worker processes in frozen builds
+    multiprocessing.freeze_support()
+
+    parser = argparse.ArgumentParser(description="ARES RGB controller")
+    parser.add_argument('--headless', action='store_true', help="run the lighting engine without the GUI")
+    parser.add_argument('--profile', help="profile to run headless (default: the favorite profile)")
+    args, _ = parser.parse_known_args() # The rest is for Qt
+
+    # Put the last colors back on the devices while the rest loads
+    from app.core.settings import settings_path
+    from app.backend.first_light import start_first_light, frame_path
+    start_first_light(settings_path(), frame_path(), on_lit=lambda devices: startup_timer.mark("first light"))
+
+    if args.headless:
+        from app.service.headless import run_headless
+        run_headless(args.profile)
+    else:
+        # Imported here so spawned render workers don't load the GUI
+        from app.gui.main_window import run_app
+        startup_timer.mark("imports")
+        run_app()